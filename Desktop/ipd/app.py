@@ -4,14 +4,15 @@ import numpy as np
 from pathlib import Path
 import glob
 import plotly.express as px
+import plotly.graph_objects as go
+import plotly.io as pio
+import hashlib
 import warnings
 import os
 import gc
+import ipd_engine as ipd
 warnings.filterwarnings('ignore')
 
-# Memory management
-gc.collect()
-
 st.set_page_config(page_title="Invisible Population Detector (IPD)", layout="wide", initial_sidebar_state="collapsed")
 
 # Check if running on Streamlit Cloud (memory constraint)
@@ -19,6 +20,19 @@ IS_CLOUD = os.getenv('STREAMLIT_CLOUD', False)
 
 BASE_DIR = Path(__file__).parent
 
+# Build the aggregates from chunked reads instead of full raw frames (for data larger than RAM)
+STREAMING = os.getenv('IPD_STREAMING', '').lower() in ('1', 'true', 'yes')
+
+# Map the data read-only from shared memory so every server process uses one copy (multi-user deployments)
+SHARED_MEMORY = os.getenv('IPD_SHARED_MEMORY', '').lower() in ('1', 'true', 'yes')
+
+# Scatter payload bounds: WebGL past SCATTER_GL_POINTS markers, binning past SCATTER_MAX_POINTS rows
+SCATTER_GL_POINTS = int(os.getenv('IPD_SCATTER_GL_POINTS', '1000'))
+SCATTER_MAX_POINTS = int(os.getenv('IPD_SCATTER_MAX_POINTS', str(ipd.SCATTER_MAX_POINTS)))
+
+# Figure definitions live in this file: editing it invalidates the cached figures
+FIGURE_CODE = hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:12]
+
 st.title("🛰️ Invisible Population Detector (IPD) — UIDAI 2026")
 st.caption("Built using UIDAI Enrolment + Demographic + Biometric datasets (Mar–Dec 2025)")
 
@@ -26,221 +40,136 @@ st.caption("Built using UIDAI Enrolment + Demographic + Biometric datasets (Mar
 if IS_CLOUD:
     st.warning("⚠️ Running on Streamlit Cloud. Multiple users may cause slowness. Please refresh if page hangs.")
 
-# ----------------------------
-# Helper functions
-# ----------------------------
-def safe_div(a, b):
-    return np.where(b == 0, np.nan, a / b)
-
-@st.cache_data(show_spinner=False, ttl=3600)
-def load_uidai_enrolment():
-    try:
-        files = sorted(list(BASE_DIR.glob("api_data_aadhar_enrolment_*.csv")))
-        if not files:
-            st.error(f"❌ Enrolment files not found in: {BASE_DIR}")
-            st.stop()
-
-        # Load with optimized dtypes for cloud memory
-        df = pd.concat([
-            pd.read_csv(f, low_memory=False, dtype={
-                'state': 'category',
-                'district': 'category',
-                'age_0_5': 'int32',
-                'age_5_17': 'int32',
-                'age_18_greater': 'int32'
-            })
-            for f in files
-        ], ignore_index=True)
-
-        df["date"] = pd.to_datetime(df["date"], errors="coerce", dayfirst=True)
-
-        for c in ["age_0_5", "age_5_17", "age_18_greater"]:
-            if c in df.columns:
-                df[c] = pd.to_numeric(df.get(c, 0), errors="coerce").fillna(0).astype(int)
-            else:
-                df[c] = 0
-
-        df["total_enrolments"] = df[["age_0_5", "age_5_17", "age_18_greater"]].sum(axis=1)
-        df["month"] = df["date"].dt.to_period("M").astype(str)
-        df["state"] = df["state"].astype(str)
-        df["district"] = df["district"].astype(str)
-
-        return df
-    except MemoryError:
-        st.error("❌ Memory limit exceeded. Try on a desktop or reduce dataset size.")
-        st.stop()
-    except Exception as e:
-        st.error(f"❌ Error loading enrolment data: {str(e)}")
-        st.stop()
-
-@st.cache_data(show_spinner=False, ttl=3600)
-def load_uidai_demo():
-    try:
-        files = sorted(list(BASE_DIR.glob("api_data_aadhar_demographic_*.csv")))
-        if not files:
-            st.error(f"❌ Demographic files not found in: {BASE_DIR}")
-            st.stop()
-
-        df = pd.concat([
-            pd.read_csv(f, low_memory=False, dtype={'state': 'category', 'district': 'category'})
-            for f in files
-        ], ignore_index=True)
-
-        df["date"] = pd.to_datetime(df["date"], errors="coerce", dayfirst=True)
-        age_cols = [c for c in df.columns if "age" in c.lower()]
-
-        for c in age_cols:
-            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype('int32')
-
-        df["total_demo_updates"] = df[age_cols].sum(axis=1)
-        df["month"] = df["date"].dt.to_period("M").astype(str)
-        df["state"] = df["state"].astype(str)
-        df["district"] = df["district"].astype(str)
-
-        return df
-    except MemoryError:
-        st.error("❌ Memory limit exceeded. Try on a desktop or reduce dataset size.")
-        st.stop()
-    except Exception as e:
-        st.error(f"❌ Error loading demographic data: {str(e)}")
-        st.stop()
-
-@st.cache_data(show_spinner=False, ttl=3600)
-def load_uidai_bio():
-    try:
-        files = sorted(list(BASE_DIR.glob("api_data_aadhar_biometric_*.csv")))
-        if not files:
-            st.error(f"❌ Biometric files not found in: {BASE_DIR}")
-            st.stop()
-
-        df = pd.concat([
-            pd.read_csv(f, low_memory=False, dtype={'state': 'category', 'district': 'category'})
-            for f in files
-        ], ignore_index=True)
-
-        df["date"] = pd.to_datetime(df["date"], errors="coerce", dayfirst=True)
-        bio_cols = [c for c in df.columns if ("bio" in c.lower()) or ("age" in c.lower())]
-
-        for c in bio_cols:
-            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype('int32')
-
-        df["total_bio_updates"] = df[bio_cols].sum(axis=1)
-        df["month"] = df["date"].dt.to_period("M").astype(str)
-        df["state"] = df["state"].astype(str)
-        df["district"] = df["district"].astype(str)
-
-        return df
-    except MemoryError:
-        st.error("❌ Memory limit exceeded. Try on a desktop or reduce dataset size.")
-        st.stop()
-    except Exception as e:
-        st.error(f"❌ Error loading biometric data: {str(e)}")
-        st.stop()
-
 # ----------------------------
 # Load datasets (LAZY LOADING - only when needed)
 # ----------------------------
+# All computation lives in ipd_engine; this script only renders. The engine
+# memoizes the aggregates per data version, so reruns don't touch raw rows.
 
 @st.cache_resource
 def init_session():
     """Initialize session state for lazy loading"""
     return {
-        'enrol_loaded': False,
-        'demo_loaded': False,
-        'bio_loaded': False
+        'data_loaded': False
     }
 
 session = init_session()
 
-# Lazy load with error handling
-try:
-    if not session.get('enrol_loaded'):
-        with st.spinner("📊 Loading enrolment data..."):
-            enrol = load_uidai_enrolment()
-            session['enrol_loaded'] = True
-    else:
-        enrol = load_uidai_enrolment()
-        
-    if not session.get('demo_loaded'):
-        with st.spinner("📊 Loading demographic data..."):
-            demo = load_uidai_demo()
-            session['demo_loaded'] = True
-    else:
-        demo = load_uidai_demo()
-        
-    if not session.get('bio_loaded'):
-        with st.spinner("📊 Loading biometric data..."):
-            bio = load_uidai_bio()
-            session['bio_loaded'] = True
-    else:
-        bio = load_uidai_bio()
-    
-    gc.collect()  # Free up memory after loading
-    st.success("✅ All datasets loaded successfully!")
-    
-except Exception as e:
-    st.error(f"❌ Error loading datasets: {str(e)}")
-    st.info("💡 Try refreshing the page or wait a few minutes before retrying.")
-    st.stop()
+def load_aggregates():
+    try:
+        if not session.get('data_loaded'):
+            with st.spinner("📊 Loading enrolment, demographic and biometric data..."):
+                agg = ipd.load_aggregates(BASE_DIR, streaming=STREAMING, shared=SHARED_MEMORY)
+                session['data_loaded'] = True
+            gc.collect()  # Free up memory after loading (reruns reuse the memoized aggregates)
+        else:
+            agg = ipd.load_aggregates(BASE_DIR, streaming=STREAMING, shared=SHARED_MEMORY)
+        return agg
+    except FileNotFoundError as e:
+        st.error(f"❌ {e}")
+        st.stop()
+    except MemoryError:
+        st.error("❌ Memory limit exceeded. Try on a desktop or reduce dataset size.")
+        st.stop()
+    except Exception as e:
+        st.error(f"❌ Error loading datasets: {str(e)}")
+        st.info("💡 Try refreshing the page or wait a few minutes before retrying.")
+        st.stop()
+
+agg = load_aggregates()
+cube = agg["cube"]
+st.success("✅ All datasets loaded successfully!")
 
 # ----------------------------
 # Sidebar Filters
 # ----------------------------
 st.sidebar.header("Filters")
 
-months = sorted(enrol["month"].dropna().unique())
-month_sel = st.sidebar.selectbox("Month", ["All"] + months, index=0)
+enrolled = ipd.enrol_cells(cube)
 
-states = sorted(enrol["state"].dropna().unique())
+period_mode = st.sidebar.radio("Period", ["Month", "Date range"], horizontal=True)
+
+months = sorted(enrolled["month"].dropna().unique())
+dates = agg["day_index"]["date"]
+date_sel = None
+if period_mode == "Month":
+    month_sel = st.sidebar.selectbox("Month", ["All"] + months, index=0)
+else:
+    # Any span (a week, a quarter, ...) of the published dates
+    month_sel = "All"
+    first, last = pd.Timestamp(dates[0]).date(), pd.Timestamp(dates[-1]).date()
+    picked = st.sidebar.date_input("Date range", (first, last), min_value=first, max_value=last)
+    picked = tuple(picked) if isinstance(picked, (list, tuple)) else (picked,)
+    date_sel = (picked[0], picked[-1]) if picked else (first, last)
+
+states = sorted(enrolled["state"].dropna().unique())
 state_sel = st.sidebar.selectbox("State", ["All"] + states, index=0)
 
-def apply_filters(df):
-    out = df.copy()
-    if month_sel != "All":
-        out = out[out["month"] == month_sel]
-    if state_sel != "All":
-        out = out[out["state"] == state_sel]
-    return out
+# A month is a slice of the month cube; a date range is read off the per-district
+# prefix sums (two binary searches and a subtraction), however long the range.
+if date_sel is None:
+    cube_f = ipd.apply_filters(cube, agg["index"], month_sel, state_sel)
+    period = month_sel
+    span = (None, None) if month_sel == "All" else (pd.Period(month_sel).start_time, pd.Period(month_sel).end_time)
+else:
+    cube_f = ipd.range_cube(agg["prefix"], *date_sel, state_sel)
+    period = span = date_sel
 
-enrol_f = apply_filters(enrol)
-demo_f = apply_filters(demo)
-bio_f = apply_filters(bio)
+# Per-session memo of the filter results: moving only the Top N slider, or
+# returning to an earlier month/state, is a lookup instead of a rescore.
+if "memo" not in st.session_state:
+    st.session_state["memo"] = ipd.Memo()
+memo = st.session_state["memo"]
+view = (agg["version"], period, state_sel)
 
 # ----------------------------
 # KPI Cards (Proof scale)
 # ----------------------------
-total_enrol = int(enrol_f["total_enrolments"].sum())
-total_demo = int(demo_f["total_demo_updates"].sum())
-total_bio = int(bio_f["total_bio_updates"].sum())
+totals = ipd.range_totals(agg["prefix"], *span, state_sel)
+total_enrol = totals["enrol"]
+total_demo = totals["demo"]
+total_bio = totals["bio"]
 
-# Peak spike day (global) - use enrol BEFORE deleting
-daily = enrol.groupby("date").agg(total=("total_enrolments", "sum")).reset_index()
-daily = daily.dropna().sort_values("total", ascending=False)
+# Peak spike day (global): busiest real day in the daily store, monthly roll-up dates excluded
+peak = ipd.busiest_day(agg["days"])
 
-if len(daily) > 0:
-    spike_date = daily.iloc[0]["date"].strftime("%Y-%m-%d")
-    spike_val = int(daily.iloc[0]["total"])
+if peak is not None:
+    spike_date = peak[0].strftime("%Y-%m-%d")
+    spike_val = peak[1]
 else:
     spike_date = "N/A"
     spike_val = 0
 
-# Clean up memory after using all data
-del daily
-gc.collect()
+# Anomalous district-days (rolling median/MAD over the daily store), within the filters
+district_spikes = ipd.spikes_in(ipd.load_spikes(BASE_DIR, "enrol", "district", STREAMING, SHARED_MEMORY), month_sel, state_sel, date_sel)
 
-c1, c2, c3, c4, c5 = st.columns(5)
+c1, c2, c3, c4, c5, c6 = st.columns(6)
 c1.metric("Total Enrolments", f"{total_enrol:,}")
 c2.metric("Total Demographic Updates", f"{total_demo:,}")
 c3.metric("Total Biometric Updates", f"{total_bio:,}")
 c4.metric("Peak Spike Day", spike_date)
 c5.metric("Spike Count", f"{spike_val:,}")
+c6.metric("District Enrolment Spikes", f"{len(district_spikes):,}")
 
 st.divider()
 
+# ----------------------------
+# Figure cache
+# ----------------------------
+# A figure depends only on the data version and its key (filters, topN, ...),
+# so it is built once, kept on disk for every process (ipd.figure_json) and
+# parsed once per process; later sessions skip plotly express entirely.
+@st.cache_resource(max_entries=256, show_spinner=False)
+def _cached_figure(version, key, _build):
+    return pio.from_json(ipd.figure_json(version, (FIGURE_CODE,) + key, lambda: _build().to_json()))
+
+def figure(key, build):
+    return _cached_figure(agg["version"], key, build)
+
 # ----------------------------
 # Tabs
 # ----------------------------
-tab1, tab2, tab3 = st.tabs(["📌 Overview", "🔥 Hotspots (Final Result)", "🛠️ Action Plan"])
+tab1, tab2, tab3, tab4 = st.tabs(["📌 Overview", "🔥 Hotspots (Final Result)", "🛠️ Action Plan", "⚡ Spikes"])
 
 # ----------------------------
 # TAB 1: Overview
@@ -248,37 +177,31 @@ tab1, tab2, tab3 = st.tabs(["📌 Overview", "🔥 Hotspots (Final Result)", "
 with tab1:
     st.subheader("1) Top States by Enrolment Activity (Proof of concentration)")
 
-    state_enrol = enrol_f.groupby("state").agg(total=("total_enrolments", "sum")).reset_index()
-    state_enrol = state_enrol.sort_values("total", ascending=False).head(15)
+    def states_figure():
+        state_enrol = ipd.state_totals(cube_f)
+        state_enrol = state_enrol.sort_values("total", ascending=False).head(15)
+        return px.bar(state_enrol, x="state", y="total",
+                      title="Top 15 States by Enrolment Activity (UIDAI 2025)")
 
-    fig = px.bar(state_enrol, x="state", y="total",
-                 title="Top 15 States by Enrolment Activity (UIDAI 2025)")
+    fig = figure(("states", period, state_sel), states_figure)
     st.plotly_chart(fig, use_container_width=True)
 
     st.info("✅ Meaning: Aadhaar activity is highly uneven across states → governance infrastructure demand is concentrated.")
 
     st.subheader("2) Age Composition of Enrolments (Proves child-heavy demand)")
 
-    age_totals = enrol_f[["age_0_5", "age_5_17", "age_18_greater"]].sum().reset_index()
-    age_totals.columns = ["age_group", "count"]
-
-    fig2 = px.pie(age_totals, names="age_group", values="count",
-                  title="Age-wise Enrolment Composition")
+    fig2 = figure(("ages", period, state_sel), lambda: px.pie(
+        ipd.age_composition(cube_f), names="age_group", values="count",
+        title="Age-wise Enrolment Composition"))
     st.plotly_chart(fig2, use_container_width=True)
 
     st.success("✅ Outcome: Most enrolments come from child buckets → enrolment demand depends strongly on family/child registration cycles.")
 
     st.subheader("3) Monthly Trends (Enrol vs Demo vs Bio)")
 
-    m_en = enrol.groupby("month").agg(enrol=("total_enrolments", "sum")).reset_index()
-    m_de = demo.groupby("month").agg(demo=("total_demo_updates", "sum")).reset_index()
-    m_bi = bio.groupby("month").agg(bio=("total_bio_updates", "sum")).reset_index()
-
-    m = m_en.merge(m_de, on="month", how="outer").merge(m_bi, on="month", how="outer").fillna(0)
-    m = m.sort_values("month")
-
-    fig3 = px.line(m, x="month", y=["enrol", "demo", "bio"], markers=True,
-                   title="Monthly Aadhaar Activity Comparison (All India)")
+    fig3 = figure(("monthly",), lambda: px.line(
+        ipd.monthly_trend(cube), x="month", y=["enrol", "demo", "bio"], markers=True,
+        title="Monthly Aadhaar Activity Comparison (All India)"))
     st.plotly_chart(fig3, use_container_width=True)
 
     st.info("✅ Meaning: Governance demand is multi-dimensional → not only enrolment, but also updates + biometric stress matter.")
@@ -299,45 +222,25 @@ We compute an Aadhaar-only proxy for “low visibility districts” within each
 ✅ Higher **VGS_proxy** = district is far below state-average activity → potential invisibility risk.
 """)
 
-    dist = enrol_f.groupby(["state", "district"]).agg(
-        observed_enrolments=("total_enrolments", "sum")
-    ).reset_index()
-
-    state_stats = dist.groupby("state").agg(
-        state_total=("observed_enrolments", "sum"),
-        num_districts=("district", "nunique")
-    ).reset_index()
-
-    dist = dist.merge(state_stats, on="state", how="left")
-    dist["expected_enrol_per_district"] = dist["state_total"] / dist["num_districts"]
-    dist["VGS_proxy"] = 1 - (dist["observed_enrolments"] / dist["expected_enrol_per_district"])
-    dist["VGS_proxy"] = dist["VGS_proxy"].clip(lower=-1, upper=5)
-
-    # Add MPI and BSI (deep insights)
-    d_demo = demo_f.groupby(["state", "district"]).agg(demo=("total_demo_updates", "sum")).reset_index()
-    d_bio = bio_f.groupby(["state", "district"]).agg(bio=("total_bio_updates", "sum")).reset_index()
-
-    dist = dist.merge(d_demo, on=["state", "district"], how="left").merge(d_bio, on=["state", "district"], how="left")
-    dist = dist.fillna(0)
-
-    dist["MPI"] = safe_div(dist["demo"], dist["observed_enrolments"])
-    dist["BSI"] = safe_div(dist["bio"], dist["observed_enrolments"])
-
-    dist["risk"] = pd.cut(dist["VGS_proxy"], bins=[-10, 0.10, 0.20, 10],
-                          labels=["Low", "Medium", "High"])
+    dist = memo.get(("districts",) + view, lambda: ipd.score_districts(cube_f))
+    ranked_all = memo.get(("ranked",) + view, lambda: ipd.top_hotspots(dist, len(dist)))
 
     topN = st.slider("Show Top N Hotspots", 5, 50, 20)
-    hotspots = dist.sort_values("VGS_proxy", ascending=False).head(topN)
+    hotspots = ranked_all.head(topN)
 
     colA, colB = st.columns([1, 1])
     with colA:
-        fig4 = px.bar(
-            hotspots.sort_values("VGS_proxy"),
-            x="VGS_proxy",
-            y=hotspots.sort_values("VGS_proxy")["district"] + " (" + hotspots.sort_values("VGS_proxy")["state"] + ")",
-            orientation="h",
-            title=f"Top {topN} Districts by Visibility Gap Score (VGS_proxy)"
-        )
+        def hotspots_figure():
+            ranked = hotspots.sort_values("VGS_proxy")
+            return px.bar(
+                ranked,
+                x="VGS_proxy",
+                y=ranked["district"].astype(str) + " (" + ranked["state"].astype(str) + ")",
+                orientation="h",
+                title=f"Top {topN} Districts by Visibility Gap Score (VGS_proxy)"
+            )
+
+        fig4 = figure(("hotspots", period, state_sel, topN), hotspots_figure)
         st.plotly_chart(fig4, use_container_width=True)
 
     with colB:
@@ -347,16 +250,67 @@ We compute an Aadhaar-only proxy for “low visibility districts” within each
         )
 
     st.subheader("MPI vs BSI (Bubble = Enrolments)")
-    fig5 = px.scatter(
-        dist,
-        x="MPI", y="BSI",
-        size="observed_enrolments",
-        color="risk",
-        hover_data=["state", "district", "VGS_proxy", "observed_enrolments"],
-        title="District Typology: Mobility Pressure vs Biometric Stress"
-    )
+
+    # Only a bounded number of markers is shipped; zooming in brings back full detail.
+    window = None
+    finite = dist[["MPI", "BSI"]].replace([np.inf, -np.inf], np.nan).dropna()
+    if len(finite) and (finite.max() > finite.min()).all():
+        with st.expander("🔍 Zoom"):
+            lo, hi = finite.min(), finite.max()
+            mpi_range = st.slider("MPI range", float(lo["MPI"]), float(hi["MPI"]), (float(lo["MPI"]), float(hi["MPI"])))
+            bsi_range = st.slider("BSI range", float(lo["BSI"]), float(hi["BSI"]), (float(lo["BSI"]), float(hi["BSI"])))
+        if (mpi_range, bsi_range) != ((lo["MPI"], hi["MPI"]), (lo["BSI"], hi["BSI"])):
+            window = (mpi_range, bsi_range)
+
+    points, cells = ipd.scatter_points(dist, max_points=SCATTER_MAX_POINTS, window=window)
+    webgl = len(points) + len(cells) > SCATTER_GL_POINTS
+
+    def scatter_figure():
+        fig = px.scatter(
+            points,
+            x="MPI", y="BSI",
+            size="observed_enrolments",
+            color="risk",
+            hover_data=["state", "district", "VGS_proxy", "observed_enrolments"],
+            title="District Typology: Mobility Pressure vs Biometric Stress",
+            render_mode="webgl" if webgl else "svg"
+        )
+        if len(cells):
+            sizeref = next((t.marker.sizeref for t in fig.data if t.marker.sizeref), None)
+            trace = go.Scattergl if webgl else go.Scatter
+            fig.add_trace(trace(
+                x=cells["MPI"], y=cells["BSI"], mode="markers",
+                name=f"{int(cells['points'].sum()):,} more (binned)",
+                marker=dict(color="lightgrey", size=cells["observed_enrolments"].clip(upper=points["observed_enrolments"].max()),
+                            sizemode="area", sizeref=sizeref),
+                customdata=cells["points"],
+                hovertemplate="%{customdata} districts<br>MPI=%{x:.2f}<br>BSI=%{y:.2f}<extra></extra>"
+            ))
+        return fig
+
+    fig5 = figure(("scatter", period, state_sel, window, SCATTER_MAX_POINTS, SCATTER_GL_POINTS), scatter_figure)
+    if len(cells):
+        st.caption(f"Showing the top {len(points):,} by VGS_proxy; the other {int(cells['points'].sum()):,} are binned (grey). Zoom in for full detail.")
     st.plotly_chart(fig5, use_container_width=True)
 
+    st.subheader("📍 Pincode Drilldown (Hotspots inside a district)")
+    st.markdown("Same scores one level down: `expected_enrol_per_pincode = district_total_enrolments / number_of_pincodes_in_district`")
+
+    # Districts listed hotspots-first; only the chosen district's pincode rows are scored.
+    drill_options = list(zip(hotspots["state"].astype(str), hotspots["district"].astype(str)))
+    drill_options += [o for o in zip(dist["state"].astype(str), dist["district"].astype(str)) if o not in set(drill_options)]
+    drill = st.selectbox("District", drill_options, format_func=lambda o: f"{o[1]} ({o[0]})")
+
+    if drill is not None and date_sel is not None:
+        st.info("💡 The pincode drilldown is kept per month: choose a month under Period in the sidebar.")
+    elif drill is not None:
+        pins = memo.get(("pincodes", agg["version"], month_sel) + drill, lambda: ipd.score_pincodes(
+            ipd.district_rows(agg["pincodes"], agg["pincode_index"], *drill, month_sel)))
+        st.dataframe(
+            ipd.top_hotspots(pins, len(pins))[["pincode", "observed_enrolments", "expected_enrol_per_pincode", "VGS_proxy", "MPI", "BSI", "risk"]],
+            use_container_width=True
+        )
+
     st.success("✅ This is your FINAL RESULT proof: hotspot zones + risk type (mobility / biometric stress).")
 
 # ----------------------------
@@ -365,21 +319,7 @@ We compute an Aadhaar-only proxy for “low visibility districts” within each
 with tab3:
     st.subheader("🛠️ Governance Action Plan (Top Hotspots)")
 
-    dist_sorted = dist.sort_values("VGS_proxy", ascending=False).head(25).copy()
-
-    def recommend(row):
-        actions = []
-        if row["VGS_proxy"] > 0.20:
-            actions.append("Mobile enrolment + outreach camps")
-        if row["MPI"] > 0.50:
-            actions.append("Assisted demographic update drive (migration/churn)")
-        if row["BSI"] > 0.50:
-            actions.append("Biometric recapture support + assisted verification")
-        if not actions:
-            actions.append("Monitor (low risk)")
-        return " | ".join(actions)
-
-    dist_sorted["recommended_action"] = dist_sorted.apply(recommend, axis=1)
+    dist_sorted = memo.get(("plan",) + view, lambda: ipd.action_plan(dist, 25))
 
     st.dataframe(
         dist_sorted[["state", "district", "VGS_proxy", "MPI", "BSI", "risk", "recommended_action"]],
@@ -388,4 +328,52 @@ with tab3:
 
     st.info("✅ This converts your analysis into a practical output: Detect → Prioritize → Intervene → Monitor")
 
+# ----------------------------
+# TAB 4: Daily Spikes (Anomaly detection)
+# ----------------------------
+with tab4:
+    st.subheader("⚡ Daily Spikes (Unusual activity days)")
+
+    st.markdown("""
+Every district's (or state's) daily series is compared with its own recent past:
+
+- `baseline = median of the previous 14 published days (within 28 days)`
+- `z = (value − baseline) / max(1.4826 × MAD, √(baseline + 1))`
+
+✅ A day is a **spike** when `z > 3.5` and it has at least 100 records. Monthly roll-up dates (Apr–Jul) are not daily data and are skipped.
+""")
+
+    colS, colL = st.columns([1, 1])
+    series = colS.radio("Series", list(ipd.SERIES), format_func=ipd.SERIES.get, horizontal=True)
+    level = colL.radio("Level", ["district", "state"], format_func=str.title, horizontal=True)
+
+    spikes = ipd.spikes_in(ipd.load_spikes(BASE_DIR, series, level, STREAMING, SHARED_MEMORY), month_sel, state_sel, date_sel)
+    st.dataframe(
+        spikes.head(100)[[c for c in ["date", "state", "district", "value", "baseline", "z"] if c in spikes.columns]],
+        use_container_width=True
+    )
+
+    if len(spikes):
+        # Units listed by their strongest spike.
+        unit_col = "district_id" if level == "district" else "state"
+        units = spikes.drop_duplicates(unit_col)
+        names = units["state"].astype(str)
+        if level == "district":
+            names = units["district"].astype(str) + " (" + names + ")"
+        labels = dict(zip(units[unit_col], names))
+        unit = st.selectbox("Show series", list(labels), format_func=labels.get)
+
+        def spike_figure():
+            s = ipd.spike_series(agg["days"], series, level, unit)
+            fig = px.line(s, x="date", y=["value", "baseline"], markers=True,
+                          title=f"Daily {ipd.SERIES[series]} activity: {labels[unit]}")
+            hits = s[s["spike"]]
+            fig.add_trace(go.Scatter(x=hits["date"], y=hits["value"], mode="markers", name="spike",
+                                     marker=dict(color="red", size=11, symbol="x")))
+            return fig
+
+        st.plotly_chart(figure(("spikes", series, level, unit), spike_figure), use_container_width=True)
+    else:
+        st.info("No spikes in the selected period/state.")
+
 st.caption("Note: VGS_proxy is an Aadhaar-only intra-state proxy for invisibility risk. Final policy action must validate hotspots with local baselines / census microdata when available.")
@@ -0,0 +1,114 @@
+"""Headless batch reports: the Tab 2 hotspot table and Tab 3 action plan for
+every state x month, without Streamlit.
+
+    python batch.py --out reports --format parquet csv --workers 8
+
+Writes, per format:
+  hotspots.<fmt>     every district scored for every month and for "All"
+                     (VGS_proxy, MPI, BSI, risk, recommended_action)
+  action_plan.<fmt>  the top --top hotspots of every (state, month) slice,
+                     including state "All", exactly as the dashboard lists them
+
+Scoring goes through ipd_engine, the same code the dashboard uses, so the
+numbers match the UI for any filter combination.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import ipd_engine as ipd
+
+BASE_DIR = Path(__file__).parent
+ALL = "All"
+
+
+def score_months(cube):
+    """District scores for every month in `cube`, in a single grouped pass."""
+    return ipd.score_districts(cube, by=["month"])
+
+
+def score_all(cube, workers=1):
+    """Scores for every month plus the all-months view, month column first.
+
+    VGS_proxy is relative to the state, so one score per (month, district)
+    covers every state filter as well. With workers > 1 the months are split
+    into groups scored on separate processes.
+    """
+    months = list(cube["month"].cat.categories)
+    if workers > 1 and len(months) > 1:
+        groups = [g for g in np.array_split(np.array(months, dtype=object), min(workers, len(months))) if len(g)]
+        parts = [cube[cube["month"].isin(g)] for g in groups]
+        with ProcessPoolExecutor(len(parts)) as pool:
+            monthly = pd.concat(list(pool.map(score_months, parts)), ignore_index=True)
+    else:
+        monthly = score_months(cube)
+
+    overall = ipd.score_districts(cube)
+    overall.insert(0, "month", ALL)
+
+    scores = pd.concat([monthly.astype({"month": str}), overall], ignore_index=True)
+    scores["recommended_action"] = ipd.recommend_actions(scores)
+    return scores
+
+
+def action_plans(scores, top):
+    """Top `top` hotspots per (state, month) slice, state "All" included.
+
+    Each slice is ranked with ipd.top_hotspots on rows in the same order the
+    dashboard sees them, so ties come out in the same order as in the UI.
+    """
+    plans = []
+    for month, month_scores in scores.groupby("month", sort=False):
+        plans.append(ipd.top_hotspots(month_scores, top).assign(slice_state=ALL))
+        for state, state_scores in month_scores.groupby("state", observed=True):
+            plans.append(ipd.top_hotspots(state_scores, top).assign(slice_state=str(state)))
+
+    plan = pd.concat(plans, ignore_index=True)
+    plan["rank"] = plan.groupby(["month", "slice_state"], sort=False).cumcount() + 1
+    cols = ["month", "slice_state", "rank", "state", "district", "VGS_proxy", "MPI", "BSI", "risk", "recommended_action"]
+    return plan[cols]
+
+
+def write(df, path, fmt):
+    if fmt == "parquet":
+        df.to_parquet(path.with_suffix(".parquet"), index=False)
+    else:
+        df.to_csv(path.with_suffix(".csv"), index=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=BASE_DIR, help="directory holding the api_data_aadhar_*.csv shards")
+    parser.add_argument("--out", type=Path, default=Path("reports"), help="output directory")
+    parser.add_argument("--format", nargs="+", choices=["parquet", "csv"], default=["parquet"])
+    parser.add_argument("--top", type=int, default=25, help="action plan rows per (state, month) slice")
+    parser.add_argument("--workers", type=int, default=1, help="processes for shard parsing and scoring")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    try:
+        enrol, demo, bio = ipd.load_datasets(args.data_dir, workers=args.workers)
+    except FileNotFoundError as e:
+        sys.exit(f"❌ {e}")
+    cube = ipd.build_cube(enrol, demo, bio)
+    del enrol, demo, bio
+
+    scores = score_all(cube, args.workers)
+    plan = action_plans(scores, args.top)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    for fmt in args.format:
+        write(scores, args.out / "hotspots", fmt)
+        write(plan, args.out / "action_plan", fmt)
+
+    print(f"✅ {len(scores):,} district scores and {len(plan):,} action plan rows written to {args.out} "
+          f"in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Headless benchmarks for the IPD pipeline stages.
+
+Runs each stage of the dashboard without Streamlit and records wall time and
+peak RSS growth (the highest RSS seen while the stage ran, minus the RSS it
+started with), first against the bundled CSV shards and then against synthetic
+datasets made by scaling the loaded rows (1x, 10x, 50x, ...):
+
+    python bench.py                      # bundled shards + 1x/10x
+    python bench.py --scales 1 10 50     # 50x needs a lot of RAM (~15 GB)
+    python bench.py --json bench.json    # keep the numbers for comparison
+
+Stages marked "legacy" re-run the original app.py code path so every change
+can be compared against it on the same box.
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ipd_engine import cube as cb
+from ipd_engine.canonical import canonicalize, district_names
+from ipd_engine.categories import unify_categories
+from ipd_engine.dates import decode_dates
+from ipd_engine.filters import (apply_date_range, apply_filters, build_date_index, build_filter_index, build_range_index,
+                                district_rows)
+from ipd_engine.kernels import group_sum
+from ipd_engine.loaders import DATASETS, shard_files
+from ipd_engine.prefix import build_prefix_sums, range_cube, range_totals
+from ipd_engine.scoring import recommend_actions, score_districts, score_pincodes
+from ipd_engine.snapshot import load_snapshot
+from ipd_engine.streaming import DAY_KEYS, shard_aggregator
+
+BASE_DIR = Path(__file__).parent
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No procfs (macOS): fall back to the process high-water mark.
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _PeakRss:
+    """Samples RSS on a background thread while a stage runs."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.start = self.peak = _rss_bytes()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, _rss_bytes())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        self.peak = max(self.peak, _rss_bytes())
+
+
+def measure(results, dataset, stage, fn, repeat=1):
+    """Run `fn` `repeat` times; record the best wall time and the peak RSS."""
+    best, peak, out = float("inf"), 0, None
+    for _ in range(repeat):
+        out = None
+        with _PeakRss() as rss:
+            t0 = time.perf_counter()
+            out = fn()
+            elapsed = time.perf_counter() - t0
+        best = min(best, elapsed)
+        peak = max(peak, rss.peak - rss.start)
+    results.append({
+        "dataset": dataset,
+        "stage": stage,
+        "seconds": round(best, 4),
+        "peak_rss_mb": round(peak / 2**20, 1),
+    })
+    print(f"{dataset:>10}  {stage:<28} {best * 1000:10.1f} ms  {peak / 2**20:8.1f} MB", flush=True)
+    return out
+
+
+# ----------------------------
+# Original app.py code paths
+# ----------------------------
+def legacy_dates(values):
+    dates = pd.to_datetime(values, errors="coerce", dayfirst=True)
+    return dates, dates.dt.to_period("M").astype(str)
+
+
+def legacy_apply_filters(df, month_sel, state_sel):
+    out = df.copy()
+    if month_sel != "All":
+        out = out[out["month"] == month_sel]
+    if state_sel != "All":
+        out = out[out["state"] == state_sel]
+    return out
+
+
+def legacy_recommend(row):
+    actions = []
+    if row["VGS_proxy"] > 0.20:
+        actions.append("Mobile enrolment + outreach camps")
+    if row["MPI"] > 0.50:
+        actions.append("Assisted demographic update drive (migration/churn)")
+    if row["BSI"] > 0.50:
+        actions.append("Biometric recapture support + assisted verification")
+    if not actions:
+        actions.append("Monitor (low risk)")
+    return " | ".join(actions)
+
+
+def legacy_group_sum(df, keys, measures):
+    return df.groupby(keys, observed=True)[measures].sum().reset_index()
+
+
+def legacy_kpis(enrol, demo, bio):
+    totals = (enrol["total_enrolments"].sum(), demo["total_demo_updates"].sum(), bio["total_bio_updates"].sum())
+    daily = enrol.groupby("date").agg(total=("total_enrolments", "sum")).reset_index()
+    return totals, daily.dropna().sort_values("total", ascending=False).head(1)
+
+
+# ----------------------------
+# Datasets
+# ----------------------------
+def load_bundled(results, repeat):
+    files = {kind: shard_files(BASE_DIR, kind) for kind in DATASETS}
+    if not all(files.values()):
+        return None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for kind, spec in DATASETS.items():
+            measure(results, "shards", f"load_csv[{kind}]",
+                    lambda: load_snapshot(kind, files[kind], spec["parse"], cache_dir=tmp, workers=1))
+        for kind, spec in DATASETS.items():
+            measure(results, "shards", f"load_streaming[{kind}]",
+                    lambda: load_snapshot(f"{kind}-daily", files[kind], shard_aggregator(kind),
+                                          cache_dir=tmp, workers=1))
+        frames = [
+            measure(results, "shards", f"load_snapshot[{kind}]",
+                    lambda: load_snapshot(kind, files[kind], spec["parse"], cache_dir=tmp), repeat)
+            for kind, spec in DATASETS.items()
+        ]
+        frames = measure(results, "shards", "canonicalize",
+                         lambda: canonicalize(unify_categories(frames), cache_dir=tmp))
+
+    raw_dates = pd.concat([pd.read_csv(f, engine="pyarrow", usecols=["date"])["date"] for f in files["demographic"]])
+    measure(results, "shards", "dates[legacy]", lambda: legacy_dates(raw_dates), repeat)
+    measure(results, "shards", "dates[decode]", lambda: decode_dates(raw_dates.astype("category")), repeat)
+    return frames
+
+
+def scale(frames, factor):
+    """`factor` copies of every row, so group cardinality stays realistic."""
+    if factor == 1:
+        return frames
+    return [df.iloc[np.tile(np.arange(len(df)), factor)].reset_index(drop=True) for df in frames]
+
+
+def bench_pipeline(results, label, frames, repeat):
+    enrol, demo, bio = frames
+    month = str(enrol["month"].dropna().iloc[0])
+    state = str(enrol["state"].mode().iloc[0])
+
+    measure(results, label, "filter[legacy]",
+            lambda: [legacy_apply_filters(df, month, state) for df in frames], repeat)
+    indexed = [build_filter_index(df) for df in frames]
+    measure(results, label, "filter[index]",
+            lambda: [apply_filters(df, ix, month, state) for df, ix in indexed], repeat)
+    del indexed
+    measure(results, label, "kpis+spike[legacy]", lambda: legacy_kpis(enrol, demo, bio), repeat)
+
+    # The raw-row groupbys behind the cube, the streaming day grain and the pincode cube.
+    for grain, df, keys, measures in [
+        ("cube", demo, ["district_id", "month"], ["total_demo_updates"]),
+        ("day", enrol, DAY_KEYS, cb.ENROL_MEASURES),
+        ("pincode", demo, ["district_id", "pincode", "month"], ["total_demo_updates"]),
+    ]:
+        measure(results, label, f"groupby[{grain}, pandas]", lambda: legacy_group_sum(df, keys, measures), repeat)
+        measure(results, label, f"groupby[{grain}, kernel]", lambda: group_sum(df, keys, measures), repeat)
+
+    cube = measure(results, label, "build_cube", lambda: cb.build_cube(enrol, demo, bio), repeat)
+    daily = measure(results, label, "build_daily", lambda: cb.build_daily(enrol), repeat)
+    cube, index = build_filter_index(cube)
+    cube_f = apply_filters(cube, index, month, state)
+    measure(results, label, "kpis+spike[cube]", lambda: (cb.kpi_totals(cube_f), cb.peak_day(daily)), repeat)
+
+    dist = measure(results, label, "score_districts[all]", lambda: score_districts(cube), repeat)
+    measure(results, label, "score_districts[filtered]", lambda: score_districts(cube_f), repeat)
+    measure(results, label, "recommend[legacy]", lambda: dist.apply(legacy_recommend, axis=1), repeat)
+    measure(results, label, "recommend[vectorized]", lambda: recommend_actions(dist), repeat)
+    by_month = measure(results, label, "score_districts[by month]", lambda: score_districts(cube, by=["month"]), repeat)
+    measure(results, label, "recommend[legacy, by month]", lambda: by_month.apply(legacy_recommend, axis=1), repeat)
+    measure(results, label, "recommend[vec, by month]", lambda: recommend_actions(by_month), repeat)
+
+    # One week in the middle of the data: a mask scans every raw row, the date index only the week.
+    days = measure(results, label, "build_cube[day]",
+                   lambda: cb.build_cube(enrol, demo, bio, keys=cb.DAY_CUBE_KEYS), repeat)
+    days, day_index = build_date_index(days)
+    start = day_index["date"][len(day_index["date"]) // 2]
+    end = start + np.timedelta64(6, "D")
+    measure(results, label, "filter[dates, mask]",
+            lambda: [df[(df["date"] >= start) & (df["date"] <= end) & (df["state"] == state)] for df in frames], repeat)
+    measure(results, label, "filter[dates, index]", lambda: apply_date_range(days, day_index, start, end, state), repeat)
+
+    # Range totals over half the dates: summing the sliced rows vs differencing the prefix sums.
+    prefix = measure(results, label, "build_prefix_sums", lambda: build_prefix_sums(days, district_names(days)), repeat)
+    lo, hi = day_index["date"][len(day_index["date"]) // 4], day_index["date"][3 * len(day_index["date"]) // 4]
+    measure(results, label, "range_totals[slice]",
+            lambda: cb.kpi_totals(apply_date_range(days, day_index, lo, hi, state)), repeat)
+    measure(results, label, "range_totals[prefix]", lambda: range_totals(prefix, lo, hi, state), repeat)
+    measure(results, label, "score_districts[range, slice]",
+            lambda: score_districts(apply_date_range(days, day_index, lo, hi)), repeat)
+    measure(results, label, "score_districts[range, prefix]", lambda: score_districts(range_cube(prefix, lo, hi)), repeat)
+
+    pins = measure(results, label, "build_cube[pincode]",
+                   lambda: cb.build_cube(enrol, demo, bio, keys=cb.PINCODE_KEYS), repeat)
+    pins = pins.sort_values(["state", "district"], kind="stable", ignore_index=True)
+    pin_index = build_range_index(pins, ["state", "district"])
+    measure(results, label, "score_pincodes[all]", lambda: score_pincodes(pins), repeat)
+    # The district with the most pincode rows is the slowest drilldown.
+    biggest = max(pin_index, key=lambda k: pin_index[k][1] - pin_index[k][0])
+    measure(results, label, "score_pincodes[district]",
+            lambda: score_pincodes(district_rows(pins, pin_index, *biggest)), repeat)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10], help="synthetic row multipliers")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage (best time is kept)")
+    parser.add_argument("--json", type=Path, help="write the results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    print(f"{'dataset':>10}  {'stage':<28} {'wall':>13}  {'peak RSS +':>11}")
+    frames = load_bundled(results, args.repeat)
+    if frames is None:
+        sys.exit(f"No api_data_aadhar_*.csv shards found in {BASE_DIR}")
+
+    for factor in args.scales:
+        scaled = scale(frames, factor)
+        bench_pipeline(results, f"{factor}x", scaled, args.repeat)
+        del scaled
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=1))
+
+
+if __name__ == "__main__":
+    main()
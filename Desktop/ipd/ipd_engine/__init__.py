@@ -0,0 +1,28 @@
+"""Streamlit-free analytics engine for the Invisible Population Detector.
+
+    import ipd_engine as ipd
+
+    agg = ipd.load_aggregates("path/to/shards")
+    cube_f = ipd.apply_filters(agg["cube"], agg["index"], month="2025-09", state="Karnataka")
+    dist = ipd.score_districts(cube_f)
+    # Any date range works the same way on the date-grain cube.
+    week = ipd.apply_date_range(agg["day_cube"], agg["day_index"], "2025-09-01", "2025-09-07")
+    # Range totals come from per-district prefix sums: two lookups and a subtraction.
+    kpis = ipd.range_totals(agg["prefix"], "2025-09-01", "2025-09-07", state="Karnataka")
+    plan = ipd.action_plan(dist)
+
+    # Drill into one district at pincode grain; only its rows are touched.
+    rows = ipd.district_rows(agg["pincodes"], agg["pincode_index"], "Karnataka", "Bengaluru Urban")
+    pins = ipd.score_pincodes(rows)
+"""
+from .cube import age_composition, build_cube, enrol_cells, kpi_totals, monthly_trend, peak_day, state_totals
+from .figures import figure_json
+from .filters import apply_date_range, apply_filters, district_rows
+from .loaders import (DATASETS, data_version, load_aggregates, load_daily_dataset, load_daily_datasets,
+                      load_dataset, load_datasets, load_pincode_dataset, load_pincode_datasets, load_spikes)
+from .memo import Memo
+from .prefix import range_cube, range_totals
+from .scatter import MAX_POINTS as SCATTER_MAX_POINTS, scatter_points
+from .scoring import (ACTION_RULES, action_plan, recommend, recommend_actions, safe_div, score_districts,
+                      score_pincodes, top_hotspots)
+from .timeseries import SERIES, busiest_day, spike_series, spike_table, spikes_in
@@ -0,0 +1,320 @@
+"""Canonical state/district names and integer district IDs.
+
+The shards spell the same district several ways ("Yamuna Nagar" /
+"Yamunanagar", "Hasan" / "Hassan", "Bangalore" / "Bengaluru Urban"), use
+renamed or merged states ("Orissa", "Dadra and Nagar Haveli") and keep
+Telangana districts such as Nalgonda under Andhra Pradesh. Grouping on the raw
+names splits one district into several small ones, which understates its
+totals and inflates VGS_proxy.
+
+Every raw (state, district) pair is resolved once, at load time:
+
+1. names are reduced to a normalized key (case, spacing, punctuation, "&",
+   trailing "*" all ignored) and looked up in a hash index;
+2. known renames and misspellings come from the curated alias tables below,
+   and districts of reorganized states are moved to their current state;
+3. remaining keys are fuzzy-matched (difflib) against the more frequent
+   districts of the same state, refusing matches that differ in a direction
+   word (North/South, Rural/Urban, ...) or in their first letter.
+
+Each canonical pair gets an integer `district_id` (in name order). The
+resolved mapping is cached on disk keyed on the set of raw pairs, so later
+loads only do array lookups.
+"""
+import difflib
+import hashlib
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .snapshot import CACHE_DIR, scratch_path
+
+# Bump when the rules below change so cached mappings are rebuilt.
+CANON_VERSION = 1
+
+FUZZY_CUTOFF = 0.88
+# Words that tell neighbouring districts apart; names differing in them never fuzzy-match.
+QUALIFIERS = {
+    "north", "south", "east", "west", "northeast", "northwest", "southeast", "southwest",
+    "eastern", "western", "upper", "lower", "central", "rural", "urban", "city",
+}
+
+STATES = [
+    "Andaman and Nicobar Islands", "Andhra Pradesh", "Arunachal Pradesh", "Assam", "Bihar",
+    "Chandigarh", "Chhattisgarh", "Dadra and Nagar Haveli and Daman and Diu", "Delhi", "Goa",
+    "Gujarat", "Haryana", "Himachal Pradesh", "Jammu and Kashmir", "Jharkhand", "Karnataka",
+    "Kerala", "Ladakh", "Lakshadweep", "Madhya Pradesh", "Maharashtra", "Manipur", "Meghalaya",
+    "Mizoram", "Nagaland", "Odisha", "Puducherry", "Punjab", "Rajasthan", "Sikkim", "Tamil Nadu",
+    "Telangana", "Tripura", "Uttar Pradesh", "Uttarakhand", "West Bengal",
+]
+
+# Normalized state key -> canonical state.
+STATE_ALIASES = {
+    "orissa": "Odisha",
+    "pondicherry": "Puducherry",
+    "uttaranchal": "Uttarakhand",
+    "chhatisgarh": "Chhattisgarh",
+    "dadraandnagarhaveli": "Dadra and Nagar Haveli and Daman and Diu",
+    "damananddiu": "Dadra and Nagar Haveli and Daman and Diu",
+    "thedadraandnagarhavelianddamananddiu": "Dadra and Nagar Haveli and Daman and Diu",
+}
+
+# Districts whose state was reorganized: (old state, district key) -> current state.
+STATE_MOVES = {
+    **{("Andhra Pradesh", k): "Telangana" for k in [
+        "adilabad", "hyderabad", "karimnagar", "khammam", "mahabubnagar",
+        "medak", "nalgonda", "nizamabad", "rangareddy", "warangal",
+    ]},
+    ("Jammu and Kashmir", "leh"): "Ladakh",
+    ("Jammu and Kashmir", "kargil"): "Ladakh",
+    ("Chandigarh", "rupnagar"): "Punjab",
+}
+
+# Canonical state -> {district key: canonical district key}: renames and
+# spellings too far apart (or too risky) for the fuzzy matcher.
+DISTRICT_ALIASES = {
+    "Andhra Pradesh": {
+        "ananthapur": "anantapur", "ananthapuramu": "anantapur", "cuddapah": "ysr",
+        "spsrnellore": "nellore", "sripottisriramulunellore": "nellore",
+        "kvrangareddy": "rangareddy", "rangareddi": "rangareddy", "mahbubnagar": "mahabubnagar",
+    },
+    "Assam": {"sibsagar": "sivasagar", "northcacharhills": "dimahasao", "karimganj": "sribhumi"},
+    "Bihar": {
+        "aurangabadbh": "aurangabad", "bhabua": "kaimurbhabua", "monghyr": "munger",
+        "purbachamparan": "eastchamparan", "purbichamparan": "eastchamparan",
+        "pashchimchamparan": "westchamparan", "purnea": "purnia",
+    },
+    "Chhattisgarh": {
+        "kawardha": "kabeerdham", "dantewada": "dakshinbastardantewada", "kanker": "uttarbastarkanker",
+    },
+    "Delhi": {"northeast": "northeastdelhi"},
+    "Gujarat": {"ahmadabad": "ahmedabad", "dohad": "dahod", "thedangs": "dang"},
+    "Haryana": {"gurgaon": "gurugram", "mewat": "nuh"},
+    "Jammu and Kashmir": {
+        "badgam": "budgam", "bandipur": "bandipore", "baramula": "baramulla", "punch": "poonch",
+        "rajauri": "rajouri", "shupiyan": "shopian", "lehladakh": "leh",
+    },
+    "Karnataka": {
+        "bangalore": "bengaluruurban", "bengaluru": "bengaluruurban", "bangalorerural": "bengalururural",
+        "ramanagar": "bengalurusouth", "ramanagara": "bengalurusouth",
+        "belgaum": "belagavi", "bellary": "ballari", "bijapur": "vijayapura", "bijapurkar": "vijayapura",
+        "gulbarga": "kalaburagi", "mysore": "mysuru", "shimoga": "shivamogga", "tumkur": "tumakuru",
+        "chickmagalur": "chikkamagaluru", "chikmagalur": "chikkamagaluru", "hasan": "hassan",
+        "chamrajnagar": "chamarajanagar", "chamrajanagar": "chamarajanagar", "davangere": "davanagere",
+    },
+    "Kerala": {"kasargod": "kasaragod"},
+    "Madhya Pradesh": {
+        "hoshangabad": "narmadapuram", "narsimhapur": "narsinghpur",
+        "eastnimar": "khandwa", "westnimar": "khargone",
+    },
+    "Maharashtra": {
+        "ahmadnagar": "ahilyanagar", "ahmednagar": "ahilyanagar",
+        "aurangabad": "chhatrapatisambhajinagar", "osmanabad": "dharashiv", "bid": "beed",
+        "buldana": "buldhana", "gondia": "gondiya", "raigarh": "raigad", "raigarhmh": "raigad",
+        "distthane": "thane",
+    },
+    "Mizoram": {"mammit": "mamit"},
+    "Odisha": {
+        "angul": "anugul", "anugal": "anugul", "baleswar": "baleshwar", "baudh": "boudh",
+        "jajpur": "jajapur", "khorda": "khordha", "sonapur": "subarnapur", "sundergarh": "sundargarh",
+    },
+    "Punjab": {
+        "ferozepur": "firozpur", "sasnagar": "sasnagarmohali", "muktsar": "srimuktsarsahib",
+        "nawanshahr": "shaheedbhagatsinghnagar",
+    },
+    "Rajasthan": {"chittaurgarh": "chittorgarh", "dhaulpur": "dholpur", "jalore": "jalor", "jhunjhunun": "jhunjhunu"},
+    "Tamil Nadu": {
+        "kanchipuram": "kancheepuram", "kanyakumari": "kanniyakumari", "thiruvallur": "tiruvallur",
+        "tiruvarur": "thiruvarur", "tirupathur": "tirupattur", "tuticorin": "thoothukkudi",
+        "viluppuram": "villupuram",
+    },
+    "Telangana": {
+        "kvrangareddy": "rangareddy", "rangareddi": "rangareddy", "jangoan": "jangaon",
+        "warangalurban": "hanumakonda", "warangalrural": "warangal",
+    },
+    "Uttar Pradesh": {
+        "allahabad": "prayagraj", "faizabad": "ayodhya", "jyotibaphulenagar": "amroha",
+        "santravidasnagar": "bhadohi", "santravidasnagarbhadohi": "bhadohi",
+    },
+    "Uttarakhand": {"hardwar": "haridwar", "garhwal": "paurigarhwal"},
+    "West Bengal": {
+        "burdwan": "barddhaman", "coochbehar": "kochbihar", "darjiling": "darjeeling", "haora": "howrah", "hawrah": "howrah",
+        "hooghiy": "hooghly", "hugli": "hooghly", "maldah": "malda", "puruliya": "purulia",
+        "eastmidnapore": "purbamedinipur", "eastmidnapur": "purbamedinipur",
+        "westmidnapore": "paschimmedinipur", "westmedinipur": "paschimmedinipur",
+        "medinipurwest": "paschimmedinipur",
+        "northtwentyfourparganas": "north24parganas", "24paraganasnorth": "north24parganas",
+        "southtwentyfourparganas": "south24parganas", "24paraganassouth": "south24parganas",
+        "south24pargana": "south24parganas",
+        "southdinajpur": "dakshindinajpur", "dinajpurdakshin": "dakshindinajpur",
+        "northdinajpur": "uttardinajpur", "dinajpuruttar": "uttardinajpur",
+    },
+}
+
+
+def name_key(name):
+    """Normalized lookup key: lowercase alphanumerics only, "&" read as "and"."""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower().replace("&", "and"))
+
+
+def _qualifiers(name):
+    return QUALIFIERS.intersection(re.findall(r"[a-z]+", str(name).lower()))
+
+
+_STATE_INDEX = {name_key(s): s for s in STATES}
+
+
+def canonical_state(name):
+    """Canonical state for a raw state name; unrecognized names are kept as they are."""
+    key = name_key(name)
+    if key in _STATE_INDEX:
+        return _STATE_INDEX[key]
+    if key in STATE_ALIASES:
+        return STATE_ALIASES[key]
+    match = difflib.get_close_matches(key, list(_STATE_INDEX), n=1, cutoff=FUZZY_CUTOFF)
+    return _STATE_INDEX[match[0]] if match else str(name).strip()
+
+
+def resolve(pairs):
+    """Canonical (state, district) for every raw pair.
+
+    `pairs` has columns state, district and rows (how much data carries the
+    pair, used to pick reference spellings). Returns a frame with the raw
+    state/district, the canonical state/district and `district_id`.
+    """
+    out = pd.DataFrame({"raw_state": pairs["state"].astype(str), "raw_district": pairs["district"].astype(str)})
+    rows = pairs["rows"].to_numpy()
+    states, keys = [], []
+    for raw_state, raw_district in zip(out["raw_state"], out["raw_district"]):
+        state, key = canonical_state(raw_state), name_key(raw_district)
+        key = DISTRICT_ALIASES.get(state, {}).get(key, key)
+        state = STATE_MOVES.get((state, key), state)
+        states.append(state)
+        keys.append(DISTRICT_ALIASES.get(state, {}).get(key, key))
+    out["state"], out["key"], out["rows"] = states, keys, rows
+
+    # Fuzzy pass: within a state, each key may fold into a busier key seen before it.
+    totals = out.groupby(["state", "key"])["rows"].sum().sort_values(ascending=False, kind="stable")
+    sample = out.groupby(["state", "key"])["raw_district"].first()
+    folded, refs = {}, {}
+    for state, key in totals.index:
+        candidates = refs.setdefault(state, [])
+        target = key
+        if key:
+            for match in difflib.get_close_matches(key, candidates, n=3, cutoff=FUZZY_CUTOFF):
+                if match[0] == key[0] and _qualifiers(sample[state, match]) == _qualifiers(sample[state, key]):
+                    target = match
+                    break
+        if target == key:
+            candidates.append(key)
+        folded[state, key] = target
+    out["key"] = [folded[s, k] for s, k in zip(out["state"], out["key"])]
+
+    # Display name: the most common spelling of the canonical key itself, else of the group.
+    out["exact"] = [name_key(d) == k for d, k in zip(out["raw_district"], out["key"])]
+    best = out.sort_values(["exact", "rows"], ascending=False, kind="stable").drop_duplicates(["state", "key"])
+    labels = dict(zip(zip(best["state"], best["key"]), best["raw_district"].str.strip().str.rstrip(" *.")))
+    out["district"] = [labels[s, k] for s, k in zip(out["state"], out["key"])]
+
+    canon = out[["state", "district"]].drop_duplicates().sort_values(["state", "district"], ignore_index=True)
+    ids = {pair: i for i, pair in enumerate(zip(canon["state"], canon["district"]))}
+    out["district_id"] = np.array([ids[p] for p in zip(out["state"], out["district"])], dtype="int32")
+    return out[["raw_state", "raw_district", "state", "district", "district_id"]]
+
+
+def _cached_resolve(pairs, cache_dir=None):
+    h = hashlib.sha1(f"{CANON_VERSION}|".encode())
+    for s, d in sorted(zip(pairs["state"].astype(str), pairs["district"].astype(str))):
+        h.update(f"{s}\x1f{d}\n".encode())
+    path = Path(cache_dir or CACHE_DIR) / "districts" / f"map-{h.hexdigest()[:16]}.parquet"
+    try:
+        return pd.read_parquet(path)
+    except (OSError, ValueError):
+        pass
+
+    table = resolve(pairs)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = scratch_path(path)
+        try:
+            table.to_parquet(tmp, index=False)
+            tmp.replace(path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        for old in path.parent.glob("map-*.parquet"):
+            if old != path:
+                old.unlink()
+    except OSError:
+        pass
+    return table
+
+
+def _pair_codes(df, n_districts):
+    s = df["state"].cat.codes.to_numpy().astype(np.int64)
+    d = df["district"].cat.codes.to_numpy().astype(np.int64)
+    return np.where((s < 0) | (d < 0), -1, s * n_districts + d)
+
+
+def canonicalize(frames, cache_dir=None):
+    """Frames with canonical state/district categoricals and an int32 `district_id`.
+
+    `frames` must share their state and district dictionaries (see
+    categories.unify_categories). Rows without a state or district get
+    district_id -1.
+    """
+    frames = list(frames)
+    state_cats = frames[0]["state"].cat.categories
+    district_cats = frames[0]["district"].cat.categories
+    n = len(district_cats)
+    size = len(state_cats) * n
+
+    codes = [_pair_codes(df, n) for df in frames]
+    weight = np.zeros(size, dtype=np.int64)
+    for df, c in zip(frames, codes):
+        w = df["rows"].to_numpy() if "rows" in df.columns else None
+        weight += np.bincount(c[c >= 0], weights=None if w is None else w[c >= 0], minlength=size).astype(np.int64)
+    present = np.flatnonzero(weight)
+
+    pairs = pd.DataFrame({
+        "state": state_cats[present // n], "district": district_cats[present % n], "rows": weight[present],
+    })
+    table = _cached_resolve(pairs, cache_dir)
+    table = pairs[["state", "district"]].astype(str).merge(
+        table, left_on=["state", "district"], right_on=["raw_state", "raw_district"], how="left", suffixes=("_raw", "")
+    )
+
+    lut = np.full(size + 1, -1, dtype=np.int32)  # last slot: missing names
+    lut[present] = table["district_id"].to_numpy()
+    canon = table[["district_id", "state", "district"]].drop_duplicates("district_id").sort_values("district_id")
+    state_dtype = pd.CategoricalDtype(sorted(canon["state"].unique()))
+    district_dtype = pd.CategoricalDtype(sorted(canon["district"].unique()))
+    id_state = np.append(pd.Categorical(canon["state"], dtype=state_dtype).codes, -1)
+    id_district = np.append(pd.Categorical(canon["district"], dtype=district_dtype).codes, -1)
+
+    out = []
+    for df, c in zip(frames, codes):
+        ids = lut[np.where(c < 0, size, c)]
+        out.append(df.assign(
+            state=pd.Categorical.from_codes(id_state[ids], dtype=state_dtype),
+            district=pd.Categorical.from_codes(id_district[ids], dtype=district_dtype),
+            district_id=ids,
+        ))
+    return out
+
+
+def district_names(*frames):
+    """Canonical (state, district) per district_id, as a frame indexed by district_id."""
+    n = max((int(df["district_id"].max()) + 1 for df in frames if len(df)), default=0)
+    state_codes = np.full(n, -1, dtype=np.int64)
+    district_codes = np.full(n, -1, dtype=np.int64)
+    for df in frames:
+        ids = df["district_id"].to_numpy()
+        keep = ids >= 0
+        state_codes[ids[keep]] = df["state"].cat.codes.to_numpy()[keep]
+        district_codes[ids[keep]] = df["district"].cat.codes.to_numpy()[keep]
+    return pd.DataFrame({
+        "state": pd.Categorical.from_codes(state_codes, dtype=frames[0]["state"].dtype),
+        "district": pd.Categorical.from_codes(district_codes, dtype=frames[0]["district"].dtype),
+    })
@@ -0,0 +1,32 @@
+"""Shared category dictionaries for the key columns.
+
+`state`, `district` and `month` stay categorical from parsing to display.
+Giving every frame (each shard part, and enrolment/demo/bio) the same sorted
+categories means concatenation keeps the compact dtype and groupbys and
+merges across datasets run on the integer codes rather than on strings.
+"""
+import pandas as pd
+
+KEY_COLUMNS = ["state", "district", "month"]
+
+
+def _categories(s):
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.categories
+    return pd.Index(s.dropna().unique())
+
+
+def unify_categories(frames, columns=KEY_COLUMNS):
+    """Recode `columns` of every frame (in place) onto one shared, sorted dictionary."""
+    frames = list(frames)
+    for col in columns:
+        present = [df for df in frames if col in df.columns]
+        if not present:
+            continue
+        cats = pd.Index([])
+        for df in present:
+            cats = cats.union(_categories(df[col]))
+        dtype = pd.CategoricalDtype(cats.sort_values())
+        for df in present:
+            df[col] = df[col].astype(dtype)
+    return frames
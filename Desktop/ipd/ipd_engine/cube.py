@@ -0,0 +1,116 @@
+"""Pre-aggregated (state, district, month) cube shared by every tab.
+
+The raw frames hold millions of pincode x day rows, but everything the
+dashboard shows is a sum at state, district or month grain. The cube is
+built once per data version and every KPI, chart and the hotspot scoring
+are answered from its few thousand rows instead of the raw frames.
+"""
+
+from .canonical import district_names
+from .kernels import group_sum
+
+CUBE_KEYS = ["state", "district", "month"]
+# Grain of the pincode drilldown: pincodes nest inside (state, district).
+PINCODE_KEYS = ["state", "district", "pincode", "month"]
+# Grain of date-range filtering: one row per district per published day.
+DAY_CUBE_KEYS = ["state", "district", "date"]
+ENROL_MEASURES = ["age_0_5", "age_5_17", "age_18_greater", "total_enrolments"]
+MEASURES = ENROL_MEASURES + ["total_demo_updates", "total_bio_updates"]
+
+
+def build_cube(enrol, demo, bio, keys=CUBE_KEYS):
+    """Sum every measure at `keys` grain (CUBE_KEYS, PINCODE_KEYS for the drilldown, DAY_CUBE_KEYS for date ranges).
+
+    Accepts either the raw frames or the day-grain aggregates from
+    streaming.py (whose `rows` column carries the raw row counts).
+    `enrol_rows` counts the raw enrolment rows behind each cell: the hotspot
+    scoring only considers districts that actually appear in the enrolment
+    data, exactly as the old `enrol_f.groupby(...)` did.
+
+    The frames must carry canonical `district_id`s (see canonical.py): the
+    three datasets are grouped and joined on the integer id, and the state
+    and district names are attached afterwards.
+    """
+    frames = [df[df["district_id"] >= 0] if (df["district_id"] < 0).any() else df for df in (enrol, demo, bio)]
+    enrol, demo, bio = frames
+    by = ["district_id"] + [k for k in keys if k not in ("state", "district")]
+
+    if "rows" in enrol.columns:
+        e = group_sum(enrol, by, ENROL_MEASURES + ["rows"]).rename(columns={"rows": "enrol_rows"})
+    else:
+        e = group_sum(enrol, by, ENROL_MEASURES, count="enrol_rows")
+    d = group_sum(demo, by, ["total_demo_updates"])
+    b = group_sum(bio, by, ["total_bio_updates"])
+
+    # The joins only see the summed cells, a few thousand rows per dataset.
+    e, d, b = (df.set_index(by) for df in (e, d, b))
+    cube = e.join(d, how="outer").join(b, how="outer").fillna(0)
+    cube = cube.astype({c: "int64" for c in MEASURES + ["enrol_rows"]}).reset_index()
+
+    # Ids are numbered in (state, district) order, so the cube stays sorted by name.
+    names = district_names(*frames).take(cube["district_id"].to_numpy())
+    for col in ("state", "district"):
+        cube[col] = names[col].array
+    return cube[keys + ["district_id"] + [c for c in cube.columns if c not in keys and c != "district_id"]]
+
+
+def build_daily(enrol):
+    """All-India enrolments per day (the spike KPI is always global)."""
+    # A single datetime key: pandas' own groupby is as fast as the kernel here.
+    return enrol.groupby("date").agg(total=("total_enrolments", "sum")).reset_index()
+
+
+def build_district_days(enrol, demo, bio):
+    """(district_id, date, enrol, demo, bio) sums; NaN where a dataset has no rows for the pair."""
+    parts = [
+        group_sum(df, ["district_id", "date"], [col]).rename(columns={col: name}).set_index(["district_id", "date"])
+        for df, col, name in [(enrol, "total_enrolments", "enrol"), (demo, "total_demo_updates", "demo"),
+                              (bio, "total_bio_updates", "bio")]
+    ]
+    return parts[0].join(parts[1], how="outer").join(parts[2], how="outer").reset_index()
+
+
+def enrol_cells(cube):
+    """Cells backed by at least one enrolment row."""
+    return cube[cube["enrol_rows"] > 0]
+
+
+def _enrol_sum(cube, key):
+    """Enrolments per `key` over the enrolment-backed cells."""
+    out = group_sum(cube, [key], ["total_enrolments"], mask=cube["enrol_rows"].to_numpy() > 0)
+    return out.rename(columns={"total_enrolments": "enrol"})
+
+
+def kpi_totals(cube):
+    return {
+        "enrol": int(cube["total_enrolments"].sum()),
+        "demo": int(cube["total_demo_updates"].sum()),
+        "bio": int(cube["total_bio_updates"].sum()),
+    }
+
+
+def peak_day(daily):
+    """(date, total) of the busiest enrolment day, or None."""
+    daily = daily.dropna().sort_values("total", ascending=False)
+    if len(daily) == 0:
+        return None
+    return daily.iloc[0]["date"], int(daily.iloc[0]["total"])
+
+
+def state_totals(cube):
+    return _enrol_sum(cube, "state").rename(columns={"enrol": "total"})
+
+
+def age_composition(cube):
+    age_totals = cube[["age_0_5", "age_5_17", "age_18_greater"]].sum().reset_index()
+    age_totals.columns = ["age_group", "count"]
+    return age_totals
+
+
+def monthly_trend(cube):
+    m_en = _enrol_sum(cube, "month")
+    m_de = group_sum(cube, ["month"], ["total_demo_updates"]).rename(columns={"total_demo_updates": "demo"})
+    m_bi = group_sum(cube, ["month"], ["total_bio_updates"]).rename(columns={"total_bio_updates": "bio"})
+
+    m = m_en.merge(m_de, on="month", how="outer").merge(m_bi, on="month", how="outer").fillna(0)
+    return m.sort_values("month")
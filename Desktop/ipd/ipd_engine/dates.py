@@ -0,0 +1,38 @@
+"""Fast decoding of the UIDAI `dd-mm-yyyy` date column.
+
+The shards hold millions of rows but only a few hundred distinct dates, so
+each distinct string is parsed once with the fixed format and the result is
+broadcast back through the integer codes. `month` comes out of the same pass
+as a categorical whose codes are the month periods, instead of formatting a
+Period string for every row.
+"""
+import numpy as np
+import pandas as pd
+
+DATE_FORMAT = "%d-%m-%Y"
+
+
+def decode_dates(values):
+    """Return (dates, month) for a column of date strings.
+
+    `dates` is datetime64 (NaT for unparseable values); `month` is a
+    categorical of "YYYY-MM" labels in chronological order.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Index(uniques).astype(str)
+    parsed = pd.to_datetime(uniques, format=DATE_FORMAT, errors="coerce")
+    odd = parsed.isna()
+    if odd.any():
+        # Anything off the fixed format goes through the old generic parser.
+        parsed = parsed.where(~odd, pd.to_datetime(uniques.where(odd), errors="coerce", dayfirst=True))
+
+    dates = pd.DatetimeIndex(parsed.to_numpy().take(codes))
+    dates = dates.where(codes >= 0)
+
+    period = np.where(parsed.isna(), -1, parsed.year * 12 + parsed.month - 1).astype(np.int64)
+    labels = np.unique(period[period >= 0])
+    month_codes = np.searchsorted(labels, period)
+    month_codes = np.where((codes >= 0) & (period.take(codes) >= 0), month_codes.take(codes), -1)
+    categories = [f"{p // 12:04d}-{p % 12 + 1:02d}" for p in labels]
+    month = pd.Categorical.from_codes(month_codes, categories=categories)
+    return dates, month
@@ -0,0 +1,70 @@
+"""On-disk cache of serialized chart figures.
+
+The dashboard's charts only change with the data or the filters, yet every
+page load rebuilt each of them with plotly express. `figure_json` keeps the
+serialized figure (any JSON text; this module does not import plotly) under
+`<cache>/figures/<data version>-<engine code>/`, keyed on the caller's key,
+so a new session or a new server process loads the text instead of
+rebuilding it. The engine code is a hash of the `ipd_engine` sources, so a
+deploy that changes the engine (scoring, name aliases, version constants)
+starts a fresh folder. Writing a figure into a new folder removes the older
+folders, and each keeps at most MAX_FIGURES files.
+"""
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from .snapshot import CACHE_DIR, scratch_path
+
+FIGURE_DIR = CACHE_DIR / "figures"
+MAX_FIGURES = 2000
+
+
+def _engine_code():
+    """Hash of the engine sources (version constants, aliases, scoring, ...)."""
+    h = hashlib.sha256()
+    for src in sorted(Path(__file__).parent.glob("*.py")):
+        h.update(src.name.encode() + b"\0" + src.read_bytes())
+    return h.hexdigest()[:12]
+
+
+# Figures show engine results, so a change to the engine code invalidates them too.
+ENGINE_CODE = _engine_code()
+
+
+def figure_json(version, key, build, cache_dir=None):
+    """Serialized figure for `key` at data `version`, calling `build()` (-> JSON text) on a miss.
+
+    `key` must have a stable repr (tuples of strings and numbers) and cover
+    everything the figure depends on besides the data.
+    """
+    root = Path(cache_dir or FIGURE_DIR)
+    folder = root / f"{version[:16]}-{ENGINE_CODE}"
+    path = folder / f"{hashlib.sha256(repr(key).encode()).hexdigest()[:24]}.json"
+    try:
+        return path.read_text(encoding="utf-8")
+    except OSError:
+        pass
+
+    text = build()
+    try:
+        folder.mkdir(parents=True, exist_ok=True)
+        tmp = scratch_path(path)
+        try:
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+
+        for old in root.iterdir():
+            if old != folder:
+                shutil.rmtree(old, ignore_errors=True)
+        files = list(folder.glob("*.json"))
+        if len(files) > MAX_FIGURES:
+            files.sort(key=lambda f: f.stat().st_mtime)
+            for f in files[:len(files) - MAX_FIGURES]:
+                f.unlink(missing_ok=True)
+    except OSError:
+        pass  # read-only checkout: figures are just rebuilt
+    return text
@@ -0,0 +1,90 @@
+"""Copy-free month/state/date filtering through precomputed row ranges.
+
+`build_filter_index` sorts a frame by (state, month) once at load time and
+records where each state and each (state, month) pair starts and stops, plus
+the row positions of every month. A filter is then a positional slice (a view,
+no copy) or, for a month across all states, a take of just that month's rows;
+selecting one state never touches the other states' rows.
+
+`build_date_index` does the same for a date-grain frame: sorted by date, any
+date range is a slice between two `searchsorted` positions.
+"""
+import numpy as np
+
+
+def build_filter_index(df, state_col="state", month_col="month", presorted=False):
+    """Return (sorted_df, index) for use with `apply_filters`.
+
+    Pass `presorted=True` for a frame that came out of this function before
+    (e.g. a shared, read-only copy) to index it without re-sorting.
+    """
+    if not presorted:
+        df = df.sort_values([state_col, month_col], kind="stable").reset_index(drop=True)
+    states = df[state_col].to_numpy()
+    months = df[month_col].to_numpy()
+
+    # Boundaries where the state / (state, month) key changes.
+    s_change = np.flatnonzero(states[1:] != states[:-1]) + 1
+    sm_change = np.union1d(s_change, np.flatnonzero(months[1:] != months[:-1]) + 1)
+    s_bounds = np.concatenate(([0], s_change, [len(df)]))
+    sm_bounds = np.concatenate(([0], sm_change, [len(df)]))
+
+    by_state = {states[a]: (int(a), int(b)) for a, b in zip(s_bounds[:-1], s_bounds[1:]) if a < b}
+    by_state_month = {(states[a], months[a]): (int(a), int(b)) for a, b in zip(sm_bounds[:-1], sm_bounds[1:]) if a < b}
+
+    uniques, codes = np.unique(months, return_inverse=True)
+    order = np.argsort(codes, kind="stable")
+    m_bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    by_month = {uniques[i]: order[m_bounds[i]:m_bounds[i + 1]] for i in range(len(uniques))}
+
+    return df, {"state": by_state, "state_month": by_state_month, "month": by_month}
+
+
+def build_date_index(df, date_col="date", presorted=False):
+    """Return (sorted_df, index) for use with `apply_date_range`.
+
+    The frame is sorted by date once, so the rows of any date range are one
+    contiguous run found with two binary searches over the sorted dates.
+    """
+    if not presorted:
+        df = df.sort_values(date_col, kind="stable").reset_index(drop=True)
+    return df, {"date": df[date_col].to_numpy().astype("datetime64[D]")}
+
+
+def build_range_index(df, keys):
+    """{key tuple: (start, stop)} of every run of equal `keys` in a frame sorted by them."""
+    values = [df[k].to_numpy() for k in keys]
+    change = np.unique(np.concatenate([np.flatnonzero(v[1:] != v[:-1]) + 1 for v in values]))
+    bounds = np.concatenate(([0], change, [len(df)]))
+    return {tuple(v[a] for v in values): (int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:]) if a < b}
+
+
+def district_rows(df, index, state, district, month="All"):
+    """Rows of one district (from `build_range_index(df, ["state", "district"])`), optionally one month."""
+    a, b = index.get((state, district), (0, 0))
+    rows = df.iloc[a:b]
+    return rows if month == "All" else rows[rows["month"] == month]
+
+
+def apply_filters(df, index, month="All", state="All"):
+    """Rows of `df` (as sorted by `build_filter_index`) matching the filters."""
+    if month == "All" and state == "All":
+        return df
+    if state != "All":
+        key = state if month == "All" else (state, month)
+        a, b = index["state" if month == "All" else "state_month"].get(key, (0, 0))
+        return df.iloc[a:b]
+    rows = index["month"].get(month)
+    return df.iloc[rows] if rows is not None else df.iloc[0:0]
+
+
+def apply_date_range(df, index, start, end, state="All"):
+    """Rows of `df` (as sorted by `build_date_index`) dated `start`..`end` inclusive, optionally one state.
+
+    Only the rows inside the range are touched, whatever the size of `df`.
+    """
+    dates = index["date"]
+    a = np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+    b = np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+    rows = df.iloc[a:b]
+    return rows if state == "All" else rows[(rows["state"] == state).to_numpy()]
@@ -0,0 +1,121 @@
+"""Group sums on integer codes instead of hashed keys.
+
+Every aggregation in the engine groups on columns that already are, or map
+cheaply onto, small integers: categorical codes (state, district, month), the
+canonical `district_id`, pincodes and day numbers. `group_codes` combines them
+into one dense int64 group number per row, and `group_sum` reduces each
+measure with a single `np.bincount(weights=...)` over those numbers, so no key
+is hashed and no intermediate index is built. Anything that does not fit (an
+object or float key, a float measure) falls back to pandas.
+"""
+import numpy as np
+import pandas as pd
+
+NAT = np.datetime64("NaT").view(np.int64)
+
+
+def _column_codes(s):
+    """(codes, size) of one key column; -1 marks a missing value."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        return s.cat.codes.to_numpy().astype(np.int64), len(s.cat.categories)
+    if pd.api.types.is_datetime64_dtype(s.dtype):
+        # Day number since the first date, so a few hundred days stay a few hundred codes.
+        days = s.to_numpy().astype("datetime64[D]").view(np.int64)
+        if len(days) == 0:
+            return days, 1
+        present = days != NAT
+        if present.all():
+            return days - days.min(), int(days.max() - days.min()) + 1
+        if not present.any():
+            return np.full(len(s), -1, dtype=np.int64), 1
+        base, last = days[present].min(), days[present].max()
+        return np.where(present, days - base, -1), int(last - base) + 1
+    if pd.api.types.is_integer_dtype(s.dtype) and not isinstance(s.dtype, pd.api.extensions.ExtensionDtype):
+        c = s.to_numpy().astype(np.int64)
+        if len(c) and c.min() < -1:
+            raise TypeError(f"{s.name} has negative values")
+        return c, int(c.max()) + 1 if len(c) else 1
+    raise TypeError(f"cannot code {s.name} ({s.dtype})")
+
+
+def group_codes(df, cols):
+    """(codes, n): a dense int64 group number per row of `df` for the columns `cols`.
+
+    Column codes are combined in mixed radix, so the group numbers sort like
+    `groupby(cols)` would. Sparse combinations (e.g. district x pincode) are
+    renumbered to 0..n-1 by factorizing the ints. Rows with a missing key get
+    -1. Raises TypeError for a column that has no integer coding.
+    """
+    codes, missing, n = np.zeros(len(df), dtype=np.int64), None, 1
+    for i, col in enumerate(cols):
+        c, size = _column_codes(df[col])
+        if n * size >= 2**62:
+            raise TypeError(f"too many {cols} combinations for int64 codes")
+        if len(c) and c.min() < 0:
+            missing = c < 0 if missing is None else missing | (c < 0)
+        codes = c if i == 0 else codes * size + c
+        n *= size
+    if missing is not None:
+        codes[missing] = -1
+    if n > 4 * len(df) + 1024:
+        # Too sparse for a dense table: hash the ints once, then rank the few uniques.
+        f, uniques = pd.factorize(codes)
+        rank = np.empty(len(uniques), dtype=np.int64)
+        rank[np.argsort(uniques, kind="stable")] = np.arange(len(uniques))
+        has_missing = missing is not None
+        codes, n = rank[f] - has_missing, len(uniques) - has_missing
+    return codes, n
+
+
+def bincount_sum(codes, n, values):
+    """Per-group sum of `values` (int64 for integer values) over rows with codes >= 0."""
+    values = np.asarray(values)
+    if len(codes) and codes.min() < 0:
+        keep = codes >= 0
+        codes, values = codes[keep], values[keep]
+    total = np.bincount(codes, weights=values, minlength=n)
+    return total.astype(np.int64) if values.dtype.kind in "biu" else total
+
+
+def group_sum(df, keys, measures, count=None, mask=None):
+    """`df.groupby(keys, observed=True)[measures].sum().reset_index()` on integer codes.
+
+    `count` names an extra column holding the number of rows per group, and
+    `mask` restricts the rows that are summed. Integer sums come back as
+    int64. Falls back to pandas when a key or measure has no integer coding.
+    """
+    keys, measures = list(keys), list(measures)
+    try:
+        if not all(df[m].dtype.kind in "biu" for m in measures):
+            raise TypeError("non-integer measure")
+        codes, n = group_codes(df, keys)
+    except TypeError:
+        return _pandas_group_sum(df, keys, measures, count, mask)
+
+    rows = np.arange(len(df))
+    keep = codes >= 0 if mask is None else (codes >= 0) & mask
+    if not keep.all():
+        codes, rows = codes[keep], rows[keep]
+    sizes = np.bincount(codes, minlength=n)
+    groups = np.flatnonzero(sizes)
+
+    # The keys are constant within a group, so any one row of it supplies them.
+    rep = np.empty(n, dtype=np.int64)
+    rep[codes] = rows
+    out = df[keys].iloc[rep[groups]].reset_index(drop=True)
+    for m in measures:
+        values = df[m].to_numpy()
+        out[m] = bincount_sum(codes, n, values if len(rows) == len(df) else values[rows])[groups]
+    if count is not None:
+        out[count] = sizes[groups].astype(np.int64)
+    return out
+
+
+def _pandas_group_sum(df, keys, measures, count, mask):
+    if mask is not None:
+        df = df[mask]
+    grouped = df.groupby(keys, observed=True)
+    out = grouped[measures].sum()
+    if count is not None:
+        out[count] = grouped.size()
+    return out.reset_index()
@@ -0,0 +1,194 @@
+"""Streamlit-free loading of the UIDAI datasets and their aggregates.
+
+Everything here takes a data directory and returns plain pandas objects, so a
+batch job, an API or a notebook can run the same pipeline as the dashboard.
+Missing shards raise FileNotFoundError; presenting the error is the caller's
+job.
+"""
+import hashlib
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from . import cube as cb
+from .canonical import canonicalize, district_names
+from .categories import unify_categories
+from .filters import build_date_index, build_filter_index, build_range_index
+from .kernels import group_sum
+from .prefix import build_prefix_sums
+from .shared import shared_frames
+from .shards import read_bio, read_demo, read_enrolment
+from .snapshot import load_snapshot, shard_fingerprint
+from .streaming import DAY_KEYS, shard_aggregator
+from .timeseries import build_daily_store, spike_table
+
+# Bump when the set or layout of the aggregate frames changes, so copies
+# already published to shared memory are rebuilt.
+AGGREGATES_VERSION = 5
+
+DATASETS = {
+    "enrolment": {
+        "label": "Enrolment", "pattern": "api_data_aadhar_enrolment_*.csv",
+        "parse": read_enrolment,
+    },
+    "demographic": {
+        "label": "Demographic", "pattern": "api_data_aadhar_demographic_*.csv",
+        "parse": read_demo,
+    },
+    "biometric": {
+        "label": "Biometric", "pattern": "api_data_aadhar_biometric_*.csv",
+        "parse": read_bio,
+    },
+}
+
+
+# What the aggregates (cube, pincode cube, daily series) read from each dataset.
+CUBE_COLUMNS = {
+    "enrolment": cb.PINCODE_KEYS + ["date"] + cb.ENROL_MEASURES,
+    "demographic": cb.PINCODE_KEYS + ["date", "total_demo_updates"],
+    "biometric": cb.PINCODE_KEYS + ["date", "total_bio_updates"],
+}
+
+
+def shard_files(base_dir, kind):
+    return sorted(Path(base_dir).glob(DATASETS[kind]["pattern"]))
+
+
+def data_version(base_dir):
+    """Changes whenever a shard is added, removed or edited."""
+    return shard_fingerprint(Path(base_dir).glob("api_data_aadhar_*.csv"))
+
+
+def _files(kind, base_dir):
+    files = shard_files(base_dir, kind)
+    if not files:
+        raise FileNotFoundError(f"{DATASETS[kind]['label']} files not found in: {base_dir}")
+    return files
+
+
+def load_dataset(kind, base_dir, workers=None, columns=None):
+    """Prepared frame for one dataset ("enrolment", "demographic" or "biometric").
+
+    The frame is memory-mapped from the snapshot store, so only the `columns`
+    (default: all) that are actually used get paged in.
+    """
+    return load_snapshot(kind, _files(kind, base_dir), DATASETS[kind]["parse"], workers=workers, columns=columns)
+
+
+def load_datasets(base_dir, workers=None, shared=False, columns=None):
+    """(enrol, demo, bio) sharing one state/district/month dictionary.
+
+    State and district names are canonicalized and every row carries an
+    integer `district_id` (see canonical.py).
+
+    `columns` maps a dataset kind to the columns to load (e.g. CUBE_COLUMNS).
+    With `shared=True` the frames are memory-mapped read-only from shared
+    memory (see shared.py) instead of being held privately by this process.
+    """
+    columns = columns or {}
+
+    def build():
+        frames = unify_categories(load_dataset(kind, base_dir, workers, columns.get(kind)) for kind in DATASETS)
+        return dict(zip(DATASETS, canonicalize(frames)))
+
+    if shared:
+        # Each projection is published under its own key.
+        projection = json.dumps({k: v and list(v) for k, v in columns.items()}, sort_keys=True)
+        key = f"datasets-{hashlib.sha1(projection.encode()).hexdigest()[:12]}" if columns else "datasets"
+        frames = shared_frames(key, f"{AGGREGATES_VERSION}.{data_version(base_dir)}", build)
+        return [frames[kind] for kind in DATASETS]
+    return list(build().values())
+
+
+def load_daily_dataset(kind, base_dir, workers=None, chunk_rows=None):
+    """(state, district, month, date) sums for one dataset, never holding raw rows.
+
+    Same columns as `load_dataset` minus `pincode`, plus `rows` (the number of
+    raw rows behind each cell).
+    """
+    return _load_summed(kind, base_dir, "daily", DAY_KEYS, workers, chunk_rows)
+
+
+def load_daily_datasets(base_dir, workers=None, chunk_rows=None):
+    return canonicalize(unify_categories(load_daily_dataset(kind, base_dir, workers, chunk_rows) for kind in DATASETS))
+
+
+def load_pincode_dataset(kind, base_dir, workers=None, chunk_rows=None):
+    """(state, district, pincode, month) sums for one dataset, built like `load_daily_dataset`."""
+    return _load_summed(kind, base_dir, "pincode", cb.PINCODE_KEYS, workers, chunk_rows)
+
+
+def load_pincode_datasets(base_dir, workers=None, chunk_rows=None):
+    return canonicalize(unify_categories(load_pincode_dataset(kind, base_dir, workers, chunk_rows) for kind in DATASETS))
+
+
+def _load_summed(kind, base_dir, grain, keys, workers, chunk_rows):
+    parse = shard_aggregator(kind, chunk_rows, keys)
+    # One part per shard, concatenated: a key summed in several shards appears once per shard.
+    df = load_snapshot(f"{kind}-{grain}", _files(kind, base_dir), parse, workers=workers)
+    return group_sum(df, keys, [c for c in df.columns if c not in keys])
+
+
+def _build_aggregates(base_dir, streaming):
+    if streaming:
+        enrol, demo, bio = load_daily_datasets(base_dir)
+        pincodes = cb.build_cube(*load_pincode_datasets(base_dir), keys=cb.PINCODE_KEYS)
+    else:
+        enrol, demo, bio = load_datasets(base_dir, columns=CUBE_COLUMNS)
+        pincodes = cb.build_cube(enrol, demo, bio, keys=cb.PINCODE_KEYS)
+    cube, _ = build_filter_index(cb.build_cube(enrol, demo, bio))
+    day_cube, _ = build_date_index(cb.build_cube(enrol, demo, bio, keys=cb.DAY_CUBE_KEYS))
+    # Each district's pincodes form one contiguous run of rows.
+    pincodes = pincodes.sort_values(["state", "district"], kind="stable", ignore_index=True)
+    return {
+        "cube": cube, "daily": cb.build_daily(enrol), "pincodes": pincodes, "day_cube": day_cube,
+        "district_days": cb.build_district_days(enrol, demo, bio),
+    }
+
+
+@lru_cache(maxsize=2)
+def _aggregates(base_dir, version, streaming, shared):
+    if shared:
+        key = "aggregates-streaming" if streaming else "aggregates"
+        frames = shared_frames(key, f"{AGGREGATES_VERSION}.{version}", lambda: _build_aggregates(base_dir, streaming))
+    else:
+        frames = _build_aggregates(base_dir, streaming)
+    cube, index = build_filter_index(frames["cube"], presorted=True)
+    day_cube, day_index = build_date_index(frames["day_cube"], presorted=True)
+    names = district_names(cube)
+    pincodes = frames["pincodes"]
+    return {
+        "version": version, "cube": cube, "index": index, "daily": frames["daily"],
+        "pincodes": pincodes, "pincode_index": build_range_index(pincodes, ["state", "district"]),
+        "day_cube": day_cube, "day_index": day_index, "prefix": build_prefix_sums(day_cube, names),
+        "days": build_daily_store(frames["district_days"], names),
+    }
+
+
+def load_aggregates(base_dir, streaming=False, shared=False):
+    """Cube, filter index, daily series, pincode cube, date-grain cube, prefix sums and daily store for the current shards.
+
+    Memoized per (directory, data version): the raw frames are read and
+    dropped once per version, and later calls return the same objects, which
+    callers must treat as read-only. With `streaming=True` the aggregates are
+    built from chunked day-grain sums and raw rows are never materialized.
+    With `shared=True` they are published once per machine and memory-mapped
+    read-only by every process (see shared.py).
+    """
+    base_dir = str(Path(base_dir).resolve())
+    return _aggregates(base_dir, data_version(base_dir), bool(streaming), bool(shared))
+
+
+@lru_cache(maxsize=12)
+def _spikes(base_dir, version, streaming, shared, measure, level):
+    return spike_table(_aggregates(base_dir, version, streaming, shared)["days"], measure, level)
+
+
+def load_spikes(base_dir, measure="enrol", level="district", streaming=False, shared=False):
+    """Flagged daily spikes of one series ("enrol", "demo" or "bio") per district or state.
+
+    Scored over the whole daily store at once (see timeseries.py) and
+    memoized per data version like `load_aggregates`.
+    """
+    base_dir = str(Path(base_dir).resolve())
+    return _spikes(base_dir, data_version(base_dir), bool(streaming), bool(shared), measure, level)
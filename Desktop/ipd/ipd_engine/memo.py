@@ -0,0 +1,74 @@
+"""Bounded LRU memo for per-filter results.
+
+The aggregates are shared and memoized per data version (loaders.py), but
+everything derived from a filter selection (the scored district table, the
+ranked hotspots, the action plan) used to be recomputed on every rerun, even
+when only the Top N slider moved. A `Memo` keeps those results keyed on the
+filters plus the data version, evicting the least recently used entries once
+their combined size passes a byte budget. It holds no locks: keep one per
+user session (e.g. in `st.session_state`).
+"""
+import os
+import sys
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+MEMO_BYTES = int(float(os.getenv("IPD_MEMO_MB", "64")) * 2**20)
+
+
+def nbytes(value):
+    """Approximate memory held by a result (frames deep, containers summed)."""
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(nbytes(k) + nbytes(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class Memo:
+    """LRU of computed results whose total `nbytes` stays within `max_bytes`."""
+
+    def __init__(self, max_bytes=MEMO_BYTES):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.hits = self.misses = 0
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, compute):
+        """Cached result for `key`, calling `compute()` (and storing it) on a miss.
+
+        Results are shared between callers and must be treated as read-only.
+        A result larger than the whole budget is returned but not kept.
+        """
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key][0]
+
+        self.misses += 1
+        value = compute()
+        size = nbytes(value)
+        if size <= self.max_bytes:
+            self._items[key] = (value, size)
+            self.used += size
+            while self.used > self.max_bytes:
+                _, (_, old) = self._items.popitem(last=False)
+                self.used -= old
+        return value
+
+    def clear(self):
+        self._items.clear()
+        self.used = 0
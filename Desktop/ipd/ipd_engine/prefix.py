@@ -0,0 +1,90 @@
+"""Per-district prefix sums over the day axis, for constant-time range totals.
+
+`build_prefix_sums` lays the date-grain cube out as one (dates + 1) x
+districts int64 array per measure, each column the running total of one
+district: row i holds the sum of the first i published dates. The total of
+any date range is then one row minus another, found with two binary searches
+over the dates, however long the range. Per-state and all-India running
+totals are kept as well, so a KPI card is two lookups and a subtraction.
+"""
+import numpy as np
+import pandas as pd
+
+from .cube import MEASURES
+from .kernels import bincount_sum
+
+PREFIX_MEASURES = MEASURES + ["enrol_rows"]
+
+
+def build_prefix_sums(day_cube, names):
+    """{"dates", "columns", "states", "state_col", "district", "state", "all"} from a DAY_CUBE_KEYS cube.
+
+    `names` is the district_names() frame (indexed by district_id). Columns
+    follow `columns` (state, district, district_id) in district_id order, so
+    each state's districts are one contiguous run, recorded in `states` as
+    {state: (first column, stop column)}. "district", "state" and "all" map
+    each of PREFIX_MEASURES to its running totals per district, per state
+    (column `state_col[state]`) and for all of India.
+    """
+    dates = np.unique(day_cube["date"].to_numpy().astype("datetime64[D]"))
+    date_code = np.searchsorted(dates, day_cube["date"].to_numpy().astype("datetime64[D]"))
+    ids = np.unique(day_cube["district_id"].to_numpy())
+    col_code = np.searchsorted(ids, day_cube["district_id"].to_numpy())
+    cell = date_code * len(ids) + col_code
+
+    columns = names.take(ids).assign(district_id=ids.astype(np.int32)).reset_index(drop=True)
+    state = columns["state"].to_numpy()
+    starts = np.flatnonzero(np.r_[True, state[1:] != state[:-1]]) if len(ids) else np.array([], dtype=np.int64)
+    bounds = np.r_[starts, len(ids)]
+
+    prefix = {
+        "dates": dates, "columns": columns,
+        "states": {state[a]: (int(a), int(b)) for a, b in zip(bounds[:-1], bounds[1:])},
+        "state_col": {state[a]: i for i, a in enumerate(starts)},
+        "district": {}, "state": {}, "all": {},
+    }
+    for m in PREFIX_MEASURES:
+        grid = bincount_sum(cell, len(dates) * len(ids), day_cube[m].to_numpy()).reshape(len(dates), len(ids))
+        cum = np.zeros((len(dates) + 1, len(ids)), dtype=np.int64)
+        np.cumsum(grid, axis=0, out=cum[1:])
+        prefix["district"][m] = cum
+        prefix["state"][m] = np.add.reduceat(cum, starts, axis=1) if len(ids) else cum
+        prefix["all"][m] = cum.sum(axis=1)
+    return prefix
+
+
+def range_rows(prefix, start=None, end=None):
+    """(a, b): prefix rows whose difference covers `start`..`end` inclusive (None = open)."""
+    dates = prefix["dates"]
+    a = 0 if start is None else np.searchsorted(dates, np.datetime64(start, "D"), side="left")
+    b = len(dates) if end is None else np.searchsorted(dates, np.datetime64(end, "D"), side="right")
+    return int(a), int(max(a, b))
+
+
+def range_totals(prefix, start=None, end=None, state="All"):
+    """KPI totals ({"enrol", "demo", "bio"}) for a date range, all India or one state."""
+    a, b = range_rows(prefix, start, end)
+    keys = {"enrol": "total_enrolments", "demo": "total_demo_updates", "bio": "total_bio_updates"}
+    if state == "All":
+        return {k: int(prefix["all"][m][b] - prefix["all"][m][a]) for k, m in keys.items()}
+    col = prefix["state_col"].get(state)
+    if col is None:
+        return {k: 0 for k in keys}
+    return {k: int(prefix["state"][m][b, col] - prefix["state"][m][a, col]) for k, m in keys.items()}
+
+
+def range_cube(prefix, start=None, end=None, state="All"):
+    """(state, district, district_id, measures..., enrol_rows) totals per district over a date range.
+
+    The same columns as a district-grain cube, so it feeds `score_districts`,
+    `state_totals`, `age_composition` and `kpi_totals` directly. Districts
+    with nothing in the range are left out.
+    """
+    a, b = range_rows(prefix, start, end)
+    lo, hi = (0, len(prefix["columns"])) if state == "All" else prefix["states"].get(state, (0, 0))
+    totals = {m: prefix["district"][m][b, lo:hi] - prefix["district"][m][a, lo:hi] for m in PREFIX_MEASURES}
+    active = np.flatnonzero(np.any([t != 0 for t in totals.values()], axis=0)) if hi > lo else np.arange(0)
+    columns = prefix["columns"].iloc[lo + active]
+    out = {c: columns[c].array for c in columns.columns}
+    out.update((m, t[active]) for m, t in totals.items())
+    return pd.DataFrame(out)
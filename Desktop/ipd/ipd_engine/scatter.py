@@ -0,0 +1,64 @@
+"""Payload-bounded data for the MPI vs BSI scatter.
+
+Every plotted row travels to the browser with its hover columns on each
+rerun. That is fine for a few hundred districts, but at pincode grain or
+across months it is tens of thousands of points and megabytes of JSON.
+`scatter_points` caps what is shipped: up to `max_points` rows go out as they
+are; beyond that the highest-ranked rows (the hotspots) are kept in full and
+the rest are folded into density-adaptive grid cells, one marker per cell.
+Narrowing the x/y window brings the rows back in full detail once few enough
+of them fall inside it.
+"""
+import numpy as np
+import pandas as pd
+
+from .kernels import bincount_sum
+
+MAX_POINTS = 3000
+
+
+def _cells(values, bins):
+    """Cell number of every value on quantile edges, so dense ranges get more cells."""
+    edges = np.unique(np.quantile(values, np.linspace(0, 1, bins + 1)))
+    return np.searchsorted(edges[1:-1], values, side="right"), max(len(edges) - 1, 1)
+
+
+def scatter_points(df, x="MPI", y="BSI", max_points=MAX_POINTS, window=None,
+                   rank="VGS_proxy", weight="observed_enrolments"):
+    """(points, cells): the rows of `df` to plot as they are, and binned markers for the rest.
+
+    Rows without a finite `x`/`y`, or outside `window` ((x0, x1), (y0, y1)),
+    are dropped. If more than `max_points` rows remain, the top half of the
+    budget by `rank` stays in `points` and the others are summed into at most
+    the other half of cells: `cells` holds their mean `x`/`y`, summed
+    `weight` and `points` (rows per cell). `cells` is empty otherwise.
+    """
+    xs, ys = df[x].to_numpy(dtype=float), df[y].to_numpy(dtype=float)
+    keep = np.isfinite(xs) & np.isfinite(ys)
+    if window is not None:
+        (x0, x1), (y0, y1) = window
+        keep &= (xs >= x0) & (xs <= x1) & (ys >= y0) & (ys <= y1)
+    if not keep.all():
+        df, xs, ys = df[keep], xs[keep], ys[keep]
+
+    cells = pd.DataFrame({x: [], y: [], weight: [], "points": []})
+    if len(df) <= max_points:
+        return df, cells
+
+    detail = max_points // 2
+    order = np.argsort(-df[rank].to_numpy(dtype=float), kind="stable")
+    rest = np.sort(order[detail:])
+    bins = max(int(np.sqrt(max_points - detail)), 1)
+    cx, nx = _cells(xs[rest], bins)
+    cy, ny = _cells(ys[rest], bins)
+    cell = cx * ny + cy
+
+    count = np.bincount(cell, minlength=nx * ny)
+    used = np.flatnonzero(count)
+    cells = pd.DataFrame({
+        x: bincount_sum(cell, nx * ny, xs[rest])[used] / count[used],
+        y: bincount_sum(cell, nx * ny, ys[rest])[used] / count[used],
+        weight: bincount_sum(cell, nx * ny, df[weight].to_numpy()[rest])[used],
+        "points": count[used],
+    })
+    return df.iloc[np.sort(order[:detail])], cells
@@ -0,0 +1,51 @@
+"""Declared columns and dtypes of the three UIDAI datasets.
+
+Each dataset lists its raw CSV columns, which of them are measures, and the
+total derived from the measures. Readers select exactly these columns (extra
+columns in a CSV are never parsed) and a caller can ask for a subset, which
+is mapped back to the raw columns it needs.
+"""
+KEY_DTYPES = {"date": "category", "state": "category", "district": "category", "pincode": "int32"}
+MEASURE_DTYPE = "int32"
+
+SCHEMAS = {
+    "enrolment": {
+        "measures": ["age_0_5", "age_5_17", "age_18_greater"],
+        "total": "total_enrolments",
+    },
+    "demographic": {
+        "measures": ["demo_age_5_17", "demo_age_17_"],
+        "total": "total_demo_updates",
+    },
+    "biometric": {
+        "measures": ["bio_age_5_17", "bio_age_17_"],
+        "total": "total_bio_updates",
+    },
+}
+
+
+def raw_dtypes(kind):
+    """{column: dtype} of the raw CSV columns of `kind`."""
+    return {**KEY_DTYPES, **{m: MEASURE_DTYPE for m in SCHEMAS[kind]["measures"]}}
+
+
+def prepared_columns(kind):
+    """Columns of a prepared frame, in order: raw columns, then month and the total."""
+    return list(raw_dtypes(kind)) + ["month", SCHEMAS[kind]["total"]]
+
+
+def raw_columns(kind, columns=None):
+    """Raw CSV columns needed to produce `columns` of the prepared frame (default: all)."""
+    schema = SCHEMAS[kind]
+    if columns is None:
+        return list(raw_dtypes(kind))
+    unknown = set(columns) - set(prepared_columns(kind))
+    if unknown:
+        raise KeyError(f"{kind} has no column(s) {sorted(unknown)}")
+
+    needed = set(columns)
+    if "month" in needed:
+        needed.add("date")
+    if schema["total"] in needed:
+        needed.update(schema["measures"])
+    return [c for c in raw_dtypes(kind) if c in needed]
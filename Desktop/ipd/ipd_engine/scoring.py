@@ -0,0 +1,130 @@
+"""District- and pincode-level Visibility Gap Score (VGS_proxy), MPI and BSI."""
+import numpy as np
+import pandas as pd
+
+from .kernels import bincount_sum, group_codes
+
+
+def safe_div(a, b):
+    return np.where(b == 0, np.nan, a / b)
+
+
+def score_districts(cube, by=()):
+    """Hotspot table for an already filtered cube.
+
+    - `expected_enrol_per_district = state_total_enrolments / number_of_districts_in_state`
+    - `VGS_proxy = 1 - (observed_enrolments / expected_enrol_per_district)`
+    - `MPI` / `BSI` = demographic / biometric updates per enrolment
+
+    `by` adds outer keys (e.g. `["month"]`) so every slice is scored
+    independently in a single pass.
+    """
+    by = list(by)
+    return _score(cube, by, ["state"], "district", by + ["state"], by + ["district_id"])
+
+
+def score_pincodes(cube, by=()):
+    """Pincode hotspot table for a (filtered) PINCODE_KEYS cube.
+
+    Same metrics one level down: `expected_enrol_per_pincode =
+    district_total_enrolments / number_of_pincodes_in_district`, so each
+    pincode is compared with the other pincodes of its own district.
+    """
+    by = list(by)
+    return _score(cube, by, ["state", "district"], "pincode", by + ["district_id"], by + ["district_id", "pincode"])
+
+
+def _score(cube, by, parent_cols, unit, parent_ids, unit_ids):
+    """Score every `unit` against the average `unit` of its parent group.
+
+    Units and parents are numbered by `group_codes` over their integer ids
+    (`unit_ids` / `parent_ids`); every sum is an `np.bincount` over those
+    numbers and the parent figures are gathered back by position, so there
+    are no joins on the name columns.
+    """
+    parent = parent_cols[-1]
+    expected = f"expected_enrol_per_{unit}"
+    unit_code, n_unit = group_codes(cube, unit_ids)
+    parent_code, n_parent = group_codes(cube, parent_ids)
+
+    valid = unit_code >= 0
+    enrolled = np.where(cube["enrol_rows"].to_numpy() > 0, unit_code, -1)
+
+    # One row per unit seen in the enrolment data; its names come from any cube row of the unit.
+    units = np.flatnonzero(np.bincount(enrolled[enrolled >= 0], minlength=n_unit))
+    rep = np.empty(n_unit, dtype=np.int64)
+    rep[unit_code[valid]] = np.flatnonzero(valid)
+    rows = rep[units]
+    unit_parent = parent_code[rows]
+
+    observed = bincount_sum(enrolled, n_unit, cube["total_enrolments"].to_numpy())[units]
+    parent_total = np.bincount(unit_parent, weights=observed, minlength=n_parent).astype(np.int64)
+    num_units = np.bincount(unit_parent, minlength=n_parent)
+
+    dist = cube[by + parent_cols + [unit]].iloc[rows].reset_index(drop=True)
+    dist["observed_enrolments"] = observed
+    dist[f"{parent}_total"] = parent_total[unit_parent]
+    dist[f"num_{unit}s"] = num_units[unit_parent].astype(np.int64)
+    dist[expected] = dist[f"{parent}_total"] / dist[f"num_{unit}s"]
+    dist["VGS_proxy"] = (1 - (dist["observed_enrolments"] / dist[expected])).clip(lower=-1, upper=5).fillna(0)
+
+    # Add MPI and BSI (deep insights)
+    dist["demo"] = bincount_sum(unit_code, n_unit, cube["total_demo_updates"].to_numpy())[units]
+    dist["bio"] = bincount_sum(unit_code, n_unit, cube["total_bio_updates"].to_numpy())[units]
+
+    dist["MPI"] = safe_div(dist["demo"], dist["observed_enrolments"])
+    dist["BSI"] = safe_div(dist["bio"], dist["observed_enrolments"])
+
+    dist["risk"] = pd.cut(dist["VGS_proxy"], bins=[-10, 0.10, 0.20, 10],
+                          labels=["Low", "Medium", "High"])
+    return dist
+
+
+# ----------------------------
+# Recommendations
+# ----------------------------
+# (metric, threshold, action): the action applies when metric > threshold.
+# Order matters: it is the order actions are listed in.
+ACTION_RULES = [
+    ("VGS_proxy", 0.20, "Mobile enrolment + outreach camps"),
+    ("MPI", 0.50, "Assisted demographic update drive (migration/churn)"),
+    ("BSI", 0.50, "Biometric recapture support + assisted verification"),
+]
+DEFAULT_ACTION = "Monitor (low risk)"
+
+
+def _action_labels(rules, default):
+    """Label for every bitmask of fired rules (bit i = rule i)."""
+    labels = []
+    for mask in range(1 << len(rules)):
+        fired = [action for bit, (_, _, action) in enumerate(rules) if mask >> bit & 1]
+        labels.append(" | ".join(fired) or default)
+    return np.array(labels, dtype=object)
+
+
+def recommend_actions(dist, rules=ACTION_RULES, default=DEFAULT_ACTION):
+    """Recommended action for every row of `dist`, evaluated column-wise.
+
+    Each rule is one vectorized comparison setting one bit; the combined
+    bitmask indexes a precomputed label table. NaN metrics never fire a rule.
+    """
+    mask = np.zeros(len(dist), dtype=np.int64)
+    for bit, (metric, threshold, _) in enumerate(rules):
+        mask |= (dist[metric].to_numpy(dtype=float) > threshold).astype(np.int64) << bit
+    return pd.Series(_action_labels(rules, default)[mask], index=dist.index, name="recommended_action")
+
+
+def recommend(row):
+    """Recommended action for a single district row."""
+    return recommend_actions(pd.DataFrame([row])).iloc[0]
+
+
+def top_hotspots(dist, n):
+    return dist.sort_values("VGS_proxy", ascending=False).head(n)
+
+
+def action_plan(dist, n=25):
+    """Top `n` hotspots with their recommended governance action."""
+    plan = top_hotspots(dist, n).copy()
+    plan["recommended_action"] = recommend_actions(plan)
+    return plan
@@ -0,0 +1,71 @@
+"""Parsing of a single UIDAI CSV shard into the frame the dashboard uses.
+
+Every derived column is row-local, so a shard can be prepared on its own and
+the results concatenated; this is what lets the snapshot store ingest only the
+shards it has not seen before.
+
+Shards are parsed with the pyarrow CSV engine, which already splits a large
+file into blocks and parses them on its own thread pool; the snapshot store
+additionally parses independent shards side by side. Only the columns
+declared in schema.py (or the requested subset of them) are parsed.
+"""
+import numpy as np
+import pandas as pd
+
+from .dates import decode_dates
+from .schema import MEASURE_DTYPE, SCHEMAS, raw_columns, raw_dtypes
+
+
+def shard_columns(path, kind, columns=None):
+    """Raw columns to read from `path` for `columns` of the prepared frame.
+
+    Declared columns missing from the file are left out; `prepare` fills
+    missing measures with 0.
+    """
+    wanted = set(raw_columns(kind, columns))
+    return [c for c in pd.read_csv(path, nrows=0).columns if c in wanted]
+
+
+def read_dtypes(kind, usecols):
+    """Dtypes to parse `usecols` with; measures are coerced later in `prepare`."""
+    dtypes = raw_dtypes(kind)
+    return {c: dtypes[c] for c in usecols if c not in SCHEMAS[kind]["measures"]}
+
+
+def prepare(df, kind, columns=None):
+    """Decode dates, coerce the measures and add the total of a raw `kind` frame."""
+    schema = SCHEMAS[kind]
+    if "date" in df.columns:
+        # Each distinct date string is parsed once; month comes back as a categorical period.
+        df["date"], df["month"] = decode_dates(df["date"])
+
+    wanted = raw_columns(kind, columns)
+    for c in schema["measures"]:
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(MEASURE_DTYPE)
+        elif c in wanted:
+            df[c] = np.zeros(len(df), dtype=MEASURE_DTYPE)
+
+    if columns is None or schema["total"] in columns:
+        df[schema["total"]] = df[schema["measures"]].sum(axis=1)
+    return df if columns is None else df[list(columns)]
+
+
+def read_shard(path, kind, columns=None):
+    """Prepared frame of one shard, parsing only the raw columns `columns` need."""
+    usecols = shard_columns(path, kind, columns)
+    df = pd.read_csv(path, engine="pyarrow", usecols=usecols, dtype=read_dtypes(kind, usecols))
+    return prepare(df, kind, columns)
+
+
+# Module-level so the snapshot store can hand them to a process pool.
+def read_enrolment(path):
+    return read_shard(path, "enrolment")
+
+
+def read_demo(path):
+    return read_shard(path, "demographic")
+
+
+def read_bio(path):
+    return read_shard(path, "biometric")
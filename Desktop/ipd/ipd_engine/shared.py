@@ -0,0 +1,78 @@
+"""Read-only frames shared across processes through memory-mapped Arrow IPC.
+
+In a multi-user deployment every Streamlit server process used to hold its
+own copy of the data. In shared mode the first process to need a frame
+builds it and writes it as an uncompressed Arrow IPC file into shared memory
+(`/dev/shm` where available, the snapshot cache otherwise); every process,
+and every session inside it, then memory-maps that file. Numeric and
+dictionary-encoded columns come back as read-only numpy views of the mapping,
+so the pages are resident once per machine and each session only allocates
+its own small filter results.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from .snapshot import CACHE_DIR, map_ipc, write_ipc
+
+try:
+    import fcntl
+except ImportError:  # Windows: builds are not serialized across processes
+    fcntl = None
+
+
+def _default_root():
+    shm = Path("/dev/shm")
+    base = shm if shm.is_dir() and os.access(shm, os.W_OK) else CACHE_DIR
+    return base / f"ipd-shared-{os.getuid() if hasattr(os, 'getuid') else 'user'}"
+
+
+SHARED_DIR = Path(os.getenv("IPD_SHARED_DIR", _default_root()))
+
+
+@contextmanager
+def _lock(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as fh:
+        if fcntl is not None:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def shared_frames(key, version, build, root=None):
+    """{name: frame} for `key` at `version`, building and publishing on a miss.
+
+    `build()` returns {name: DataFrame}; it runs in at most one process at a
+    time, and older versions of `key` are removed once a new one is published.
+    """
+    root = Path(root or SHARED_DIR)
+    # Each key has its own folder, so cleaning up one key never touches another
+    # whose name merely starts the same way (aggregates / aggregates-streaming).
+    folder = root / key
+    target = folder / version[:16]
+
+    if not (target / "DONE").exists():
+        with _lock(root / f"{key}.lock"):
+            if not (target / "DONE").exists():
+                folder.mkdir(parents=True, exist_ok=True)
+                tmp = Path(tempfile.mkdtemp(prefix=".build-", dir=folder))
+                try:
+                    for name, df in build().items():
+                        write_ipc(df, tmp / f"{name}.arrow")
+                    (tmp / "DONE").touch()
+                    shutil.rmtree(target, ignore_errors=True)
+                    os.replace(tmp, target)
+                finally:
+                    shutil.rmtree(tmp, ignore_errors=True)
+                # Processes still mapping an old version keep their pages until they let go.
+                for old in folder.iterdir():
+                    if old != target and not old.name.startswith("."):
+                        shutil.rmtree(old, ignore_errors=True)
+
+    return {p.stem: map_ipc(p) for p in target.glob("*.arrow")}
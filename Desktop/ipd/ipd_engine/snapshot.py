@@ -0,0 +1,264 @@
+"""Persistent, incrementally maintained columnar snapshots of the UIDAI shards.
+
+Parsing the raw CSVs takes minutes and `st.cache_data` only lives as long as
+the process, so every container restart paid for it again. Each shard is now
+parsed once into its own Parquet part under `<cache>/<name>/`, and a manifest
+records which shards (by the row range in the file name plus a content hash)
+are already materialized. When UIDAI drops a new
+`api_data_aadhar_<kind>_<start>_<end>.csv`, only that file is parsed; the other
+parts are read straight back from disk.
+
+The parts are then consolidated into one uncompressed Arrow IPC file per
+dataset, which is opened with memory mapping: a load is zero-copy for the
+numeric and categorical columns, and a process only pays page faults for the
+columns it actually touches. The file is rewritten only when a part changes.
+"""
+import hashlib
+import json
+import multiprocessing
+import os
+import re
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+
+from .categories import unify_categories
+
+CACHE_DIR = Path(os.getenv("IPD_CACHE_DIR", Path(__file__).resolve().parent.parent / ".ipd_cache"))
+
+# Bump when the per-shard preparation changes so stale parts are rebuilt.
+SNAPSHOT_VERSION = 6
+
+_RANGE_RE = re.compile(r"_(\d+)_(\d+)\.csv$")
+
+
+def shard_range(path):
+    """(start, end) row range encoded in a shard file name, or None."""
+    m = _RANGE_RE.search(Path(path).name)
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def shard_key(path):
+    rng = shard_range(path)
+    return f"{rng[0]}_{rng[1]}" if rng else Path(path).stem
+
+
+def order_shards(files):
+    """Sort shards by their starting row (plain `sorted` puts 1000000 before 500000)."""
+    return sorted((Path(f) for f in files), key=lambda f: (shard_range(f) or (float("inf"), 0), f.name))
+
+
+def content_hash(path, chunk_size=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def shard_fingerprint(files):
+    """Hash of the shard names, sizes and mtimes (cheap, no file reads)."""
+    h = hashlib.sha1()
+    for f in sorted(Path(f) for f in files):
+        st = f.stat()
+        h.update(f"{f.name}|{st.st_size}|{st.st_mtime_ns}\n".encode())
+    return h.hexdigest()
+
+
+def _read_manifest(path):
+    try:
+        manifest = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("version") != SNAPSHOT_VERSION:
+        return {}
+    return manifest.get("shards", {})
+
+
+def write_ipc(df, path):
+    """Write `df` as an uncompressed Arrow IPC (Feather v2) file."""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(str(path), "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def map_ipc(path, columns=None):
+    """DataFrame backed by a memory-mapped Arrow IPC file (zero-copy where possible)."""
+    table = ipc.open_file(pa.memory_map(str(path), "r")).read_all()
+    if columns is not None:
+        table = table.select(columns)
+    return table.to_pandas(split_blocks=True)
+
+
+def scratch_path(path):
+    """A new, uniquely named file beside `path`, to write and then `os.replace` into place.
+
+    Every writer gets its own file, so processes building the same cache
+    entry at once never write into each other's output.
+    """
+    fd, tmp = tempfile.mkstemp(prefix=f"{path.name}.", suffix=".tmp", dir=path.parent)
+    os.close(fd)
+    return Path(tmp)
+
+
+def _write_part(df, path):
+    tmp = scratch_path(path)
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def default_workers():
+    """Worker count from `IPD_WORKERS`, else one per core."""
+    try:
+        return max(1, int(os.getenv("IPD_WORKERS", "")))
+    except ValueError:
+        return os.cpu_count() or 1
+
+
+def _ingest(parse, f, store, key, entry):
+    """Hash, and if needed parse and write, one shard. Runs inside a pool worker.
+
+    Returns (entry, frame): frame is None when the part is on disk.
+    """
+    st = f.stat()
+    digest = content_hash(f)
+    if entry and (store / entry["part"]).exists() and entry["sha1"] == digest:
+        # Touched but not changed (e.g. re-downloaded): keep the part.
+        return dict(entry, size=st.st_size, mtime_ns=st.st_mtime_ns), None
+
+    df = parse(f)
+    entry = {
+        "file": f.name,
+        "range": shard_range(f),
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "sha1": digest,
+        "rows": len(df),
+        "part": f"part-{key}-{digest[:12]}.parquet",
+    }
+    try:
+        store.mkdir(parents=True, exist_ok=True)
+        _write_part(df, store / entry["part"])
+    except OSError:
+        return None, df
+    return entry, None
+
+
+def _run(tasks, workers, pool):
+    if workers <= 1 or len(tasks) <= 1:
+        return [_ingest(*t) for t in tasks]
+    if pool == "process":
+        # spawn, not fork: the Streamlit server is multi-threaded.
+        executor = ProcessPoolExecutor(min(workers, len(tasks)), mp_context=multiprocessing.get_context("spawn"))
+    else:
+        executor = ThreadPoolExecutor(min(workers, len(tasks)))
+    with executor:
+        return list(executor.map(_ingest, *zip(*tasks)))
+
+
+def sync_shards(name, files, parse, cache_dir=None, workers=None, pool=None):
+    """Bring the part store for `name` in line with `files`.
+
+    Shards that need hashing or parsing are handled `workers` at a time on a
+    thread pool (pyarrow releases the GIL while parsing) or, with
+    `pool="process"`, on a process pool; `parse` must then be a module-level
+    function. Both default to the `IPD_WORKERS` / `IPD_POOL` env vars.
+
+    Returns a list of (key, frame_or_path) in row order: a Path for parts that
+    are already on disk, or the freshly parsed frame when the part could not
+    be written (read-only checkout).
+    """
+    workers = workers or default_workers()
+    pool = pool or os.getenv("IPD_POOL", "thread")
+    store = Path(cache_dir or CACHE_DIR) / name
+    manifest_path = store / "manifest.json"
+    known = _read_manifest(manifest_path)
+    shards, parts, tasks = {}, [], []
+
+    for f in order_shards(files):
+        key = shard_key(f)
+        st = f.stat()
+        entry = known.get(key)
+
+        if entry and (store / entry["part"]).exists() and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            shards[key] = entry
+            parts.append((key, store / entry["part"]))
+        else:
+            parts.append((key, None))
+            tasks.append((parse, f, store, key, entry))
+
+    done = iter(_run(tasks, workers, pool))
+    for i, (key, src) in enumerate(parts):
+        if src is None:
+            entry, df = next(done)
+            if entry is None:
+                parts[i] = (key, df)
+            else:
+                shards[key] = entry
+                parts[i] = (key, store / entry["part"])
+
+    try:
+        live = {e["part"] for e in shards.values()}
+        for stale in store.glob("part-*.parquet"):
+            if stale.name not in live:
+                stale.unlink(missing_ok=True)
+        tmp = scratch_path(manifest_path)
+        try:
+            tmp.write_text(json.dumps({"version": SNAPSHOT_VERSION, "shards": shards}, indent=1))
+            os.replace(tmp, manifest_path)
+        finally:
+            tmp.unlink(missing_ok=True)
+    except OSError:
+        pass
+
+    return parts
+
+
+def _consolidate(store, parts):
+    """Path of the memory-mappable file combining `parts`, writing it if needed."""
+    h = hashlib.sha1(f"{SNAPSHOT_VERSION}|".encode())
+    for _, src in parts:
+        h.update(f"{src.name}|".encode())
+    path = store / f"combined-{h.hexdigest()[:16]}.arrow"
+    if not path.exists():
+        frames = unify_categories(pd.read_parquet(src) for _, src in parts)
+        tmp = scratch_path(path)
+        try:
+            write_ipc(pd.concat(frames, ignore_index=True), tmp)
+            os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        # Mappings of an older file stay valid after unlink on POSIX.
+        for old in store.glob("combined-*.arrow"):
+            if old != path:
+                old.unlink()
+    return path
+
+
+def load_snapshot(name, files, parse, cache_dir=None, workers=None, pool=None, columns=None):
+    """Concatenated frame for `files`, parsing only shards not yet materialized.
+
+    `columns` restricts the result to those columns; with a writable cache
+    the others are never read from disk.
+    """
+    parts = sync_shards(name, files, parse, cache_dir, workers, pool)
+    if parts and all(isinstance(src, Path) for _, src in parts):
+        try:
+            return map_ipc(_consolidate(parts[0][1].parent, parts), columns)
+        except OSError:
+            pass
+
+    frames = [
+        pd.read_parquet(src, columns=columns) if isinstance(src, Path) else src[columns or src.columns]
+        for _, src in parts
+    ]
+    # Parts carry their own dictionaries; align them so concat stays categorical.
+    return pd.concat(unify_categories(frames), ignore_index=True)
@@ -0,0 +1,72 @@
+"""Bounded-memory aggregation of the UIDAI shards.
+
+The regular loaders materialize every raw row before aggregating, which is
+what runs into MemoryError as the data grows. Here each shard is read in
+fixed-size row chunks; every chunk is prepared, summed to (state, district,
+month, date) grain and folded into a running aggregate, so at most one chunk
+of raw rows is alive at a time. Memory is bounded by the chunk size plus the
+aggregate (districts x days), whatever the total input size.
+
+The same folding at PINCODE_KEYS grain feeds the pincode drilldown without
+ever holding raw rows either.
+
+The per-shard aggregates go through the same snapshot store as the raw parts,
+so shards are still ingested incrementally and in parallel. Only the
+grain's keys and the measures are parsed (day grain never reads `pincode`).
+"""
+import os
+from functools import partial
+
+import pandas as pd
+
+from .categories import unify_categories
+from .kernels import group_sum
+from .schema import SCHEMAS
+from .shards import prepare, read_dtypes, shard_columns
+
+DAY_KEYS = ["state", "district", "month", "date"]
+CHUNK_ROWS = int(os.getenv("IPD_CHUNK_ROWS", "250000"))
+
+def aggregate_chunk(df, keys=DAY_KEYS):
+    """Sum a prepared frame of keys and measures to `keys` grain; `rows` counts the raw rows."""
+    return group_sum(df, keys, [c for c in df.columns if c not in keys], count="rows")
+
+
+def fold(parts, keys=DAY_KEYS):
+    """Merge partial aggregates (which may overlap) into one.
+
+    With no rows at all (e.g. header-only shards) the first part is returned
+    as is, keeping its key and measure columns.
+    """
+    parts = list(parts)
+    filled = unify_categories(p for p in parts if len(p))
+    if not filled:
+        return parts[0] if parts else pd.DataFrame(columns=list(keys))
+    parts = filled
+    if len(parts) == 1:
+        return parts[0]
+    df = pd.concat(parts, ignore_index=True)
+    return group_sum(df, keys, [c for c in df.columns if c not in keys])
+
+
+def aggregate_shard(path, kind, chunk_rows=None, keys=DAY_KEYS):
+    """`keys`-grain aggregate of one `kind` shard, reading at most `chunk_rows` rows at a time."""
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    keys = list(keys)
+    columns = keys + SCHEMAS[kind]["measures"] + [SCHEMAS[kind]["total"]]
+    usecols = shard_columns(path, kind, columns)
+    acc, pending = [], 0
+    for chunk in pd.read_csv(path, usecols=usecols, dtype=read_dtypes(kind, usecols), chunksize=chunk_rows):
+        part = aggregate_chunk(prepare(chunk, kind, columns), keys)
+        acc.append(part)
+        pending += len(part)
+        # Keep the partials themselves bounded too.
+        if pending > chunk_rows:
+            acc = [fold(acc, keys)]
+            pending = len(acc[0])
+    return fold(acc, keys)
+
+
+def shard_aggregator(kind, chunk_rows=None, keys=DAY_KEYS):
+    """Picklable `parse` callback for the snapshot store."""
+    return partial(aggregate_shard, kind=kind, chunk_rows=chunk_rows, keys=keys)
@@ -0,0 +1,183 @@
+"""Dense date x district daily series and rolling robust spike scoring.
+
+`build_daily_store` turns the (district_id, date) sums into one dense
+(dates x districts) float array per measure, built once per data version.
+The date axis holds every date that appears in any dataset; UIDAI publishes
+irregularly, so calendar gaps are not treated as zero days. A date on which
+a dataset published nothing is NaN for that measure, and a district with no
+rows on a published date is 0. A month with a single published date (Apr-Jul
+2025 in the bundled data) is a monthly roll-up rather than a day; such dates
+are kept in the store but marked in `rollups` and left out of spike scoring.
+
+`score_spikes` scores every cell of such an array at once against a trailing
+window of the previous SPIKE_WINDOW published dates, counting only those
+within SPIKE_LOOKBACK_DAYS (so a baseline never reaches across a months-long
+gap in publication):
+
+    z = (value - rolling median) / max(1.4826 * rolling MAD, sqrt(rolling median + 1))
+
+The MAD is the robust spread of the window; the square-root floor keeps
+sparse, low-count series (where the MAD is often 0) from flagging every
+small bump. A cell is a spike when z > SPIKE_Z and the value is at least
+SPIKE_MIN_COUNT.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+SERIES = {"enrol": "Enrolment", "demo": "Demographic", "bio": "Biometric"}
+SPIKE_WINDOW = 14
+SPIKE_MIN_PERIODS = 7
+SPIKE_LOOKBACK_DAYS = 28
+SPIKE_Z = 3.5
+SPIKE_MIN_COUNT = 100
+
+
+def build_daily_store(district_days, names):
+    """{"dates", "columns", "rollups", "enrol", "demo", "bio"} from a (district_id, date, enrol, demo, bio) frame.
+
+    `names` is the district_names() frame (indexed by district_id); the
+    columns of every array follow `columns` (district_id, state, district),
+    in district_id order, so each state's districts are contiguous.
+    """
+    district_days = district_days[district_days["date"].notna()]
+    dates = pd.DatetimeIndex(np.sort(district_days["date"].unique()))
+    date_code = np.searchsorted(dates.to_numpy(), district_days["date"].to_numpy())
+    ids = np.sort(district_days["district_id"].unique())
+    col_code = np.searchsorted(ids, district_days["district_id"].to_numpy())
+
+    months = dates.year * 12 + dates.month
+    store = {
+        "dates": dates,
+        "columns": names.take(ids).assign(district_id=ids.astype(np.int32)).reset_index(drop=True),
+        "rollups": {},
+    }
+    for measure in SERIES:
+        values = district_days[measure].to_numpy(dtype=float)
+        grid = np.zeros((len(dates), len(ids)))
+        grid[date_code, col_code] = np.nan_to_num(values)
+        published = np.zeros(len(dates), dtype=bool)
+        published[date_code[~np.isnan(values)]] = True
+        grid[~published] = np.nan
+        store[measure] = grid
+        # Published dates per month; a lone one is a monthly roll-up.
+        per_month = pd.Series(published).groupby(months).transform("sum").to_numpy()
+        store["rollups"][measure] = published & (per_month == 1)
+    return store
+
+
+def state_series(store, measure):
+    """(states, dates x states array): the district columns of `measure` summed per state."""
+    states = store["columns"]["state"]
+    starts = np.flatnonzero(np.r_[True, states.to_numpy()[1:] != states.to_numpy()[:-1]])
+    return states.iloc[starts].reset_index(drop=True), np.add.reduceat(store[measure], starts, axis=1)
+
+
+def busiest_day(store, measure="enrol"):
+    """(date, total) of the busiest all-India day of `measure`, or None; roll-up dates never count."""
+    values = store[measure]
+    daily = ~store["rollups"][measure] & ~np.isnan(values).all(axis=1)
+    if not daily.any():
+        return None
+    totals = np.nansum(values[daily], axis=1)
+    i = int(np.argmax(totals))
+    return store["dates"][daily][i], int(totals[i])
+
+
+def rolling_baseline(values, dates, window=SPIKE_WINDOW, min_periods=SPIKE_MIN_PERIODS,
+                     lookback=SPIKE_LOOKBACK_DAYS):
+    """(median, mad) of the `window` rows before each row, for every column at once.
+
+    Rows more than `lookback` days older than the row being scored, and NaN
+    rows, are skipped; rows with fewer than `min_periods` values left get NaN.
+    """
+    padded = np.vstack([np.full((window, values.shape[1]), np.nan), values[:-1]])
+    windows = sliding_window_view(padded, window, axis=0)  # (dates, columns, window), no copy
+
+    day = dates.to_numpy().astype("datetime64[D]").astype(np.int64)
+    past = sliding_window_view(np.r_[np.full(window, np.iinfo(np.int64).min // 2), day[:-1]], window)
+    recent = (day[:, None] - past) <= lookback
+    windows = np.where(recent[:, None, :], windows, np.nan)
+    enough = (~np.isnan(windows)).sum(axis=2) >= min_periods
+    median = _nanmedian(windows)
+    mad = _nanmedian(np.abs(windows - median[..., None]))
+    median[~enough] = np.nan
+    mad[~enough] = np.nan
+    return median, mad
+
+
+def _nanmedian(windows):
+    """Median over the last axis ignoring NaN: one sort (NaNs go last) and two gathers.
+
+    np.nanmedian falls back to a per-row Python loop as soon as a NaN is present.
+    """
+    ordered = np.sort(windows, axis=-1)
+    count = (~np.isnan(ordered)).sum(axis=-1, keepdims=True)
+    lo = np.take_along_axis(ordered, np.maximum(count - 1, 0) // 2, axis=-1)
+    hi = np.take_along_axis(ordered, np.minimum(count // 2, windows.shape[-1] - 1), axis=-1)
+    median = ((lo + hi) / 2)[..., 0]
+    median[count[..., 0] == 0] = np.nan
+    return median
+
+
+def score_spikes(values, dates, window=SPIKE_WINDOW, threshold=SPIKE_Z, min_count=SPIKE_MIN_COUNT):
+    """{"median", "z", "flags"} arrays shaped like `values`, one row per date (see the module docstring)."""
+    median, mad = rolling_baseline(values, dates, window)
+    scale = np.maximum(1.4826 * mad, np.sqrt(np.maximum(median, 0) + 1))
+    with np.errstate(all="ignore"):
+        z = (values - median) / scale
+    flags = (z > threshold) & (values >= min_count)
+    return {"median": median, "z": z, "flags": flags}
+
+
+def spike_table(store, measure, level="district", **params):
+    """Every flagged spike of `measure` as rows of (date, month, [state, district,] value, baseline, z).
+
+    `level` is "district" or "state"; rows are sorted by z, highest first.
+    """
+    if level == "state":
+        columns, values = state_series(store, measure)
+        columns = columns.to_frame()
+    else:
+        columns, values = store["columns"], store[measure]
+    values = np.where(store["rollups"][measure][:, None], np.nan, values)
+    scored = score_spikes(values, store["dates"], **params)
+    t, c = np.nonzero(scored["flags"])
+    dates = store["dates"][t]
+    table = columns.iloc[c].reset_index(drop=True)
+    table.insert(0, "date", dates)
+    table.insert(1, "month", pd.Categorical(dates.strftime("%Y-%m")))
+    table["value"] = values[t, c].astype(np.int64)
+    table["baseline"] = scored["median"][t, c]
+    table["z"] = scored["z"][t, c]
+    return table.sort_values("z", ascending=False, kind="stable", ignore_index=True)
+
+
+def spikes_in(table, month="All", state="All", dates=None):
+    """Rows of a `spike_table` inside the dashboard's month/state filters, or a (start, end) date range."""
+    keep = np.ones(len(table), dtype=bool)
+    if dates is not None:
+        day = table["date"].to_numpy().astype("datetime64[D]")
+        keep &= (day >= np.datetime64(dates[0], "D")) & (day <= np.datetime64(dates[1], "D"))
+    if month != "All":
+        keep &= (table["month"] == month).to_numpy()
+    if state != "All":
+        keep &= (table["state"] == state).to_numpy()
+    return table[keep]
+
+
+def spike_series(store, measure, level, key, **params):
+    """(date, value, baseline, z, spike) of one district (by district_id) or state, roll-up dates left out."""
+    if level == "state":
+        columns, values = state_series(store, measure)
+        col = int(np.flatnonzero(columns.to_numpy() == key)[0])
+    else:
+        col = int(np.searchsorted(store["columns"]["district_id"].to_numpy(), key))
+        values = store[measure]
+    daily = ~store["rollups"][measure] & ~np.isnan(values[:, col])
+    values = values[daily][:, [col]]
+    scored = score_spikes(values, store["dates"][daily], **params)
+    return pd.DataFrame({
+        "date": store["dates"][daily], "value": values[:, 0],
+        "baseline": scored["median"][:, 0], "z": scored["z"][:, 0], "spike": scored["flags"][:, 0],
+    })
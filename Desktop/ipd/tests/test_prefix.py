@@ -0,0 +1,77 @@
+"""Prefix-sum range queries against slicing the date-grain cube."""
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+import ipd_engine as ipd
+from ipd_engine.canonical import district_names
+from ipd_engine.cube import MEASURES
+from ipd_engine.filters import build_date_index
+from ipd_engine.prefix import build_prefix_sums
+
+STATES = ["Bihar", "Karnataka", "Kerala"]
+
+
+@pytest.fixture(scope="module")
+def day_cube():
+    """A DAY_CUBE_KEYS cube: 12 districts, irregular published dates, some empty cells."""
+    rng = np.random.default_rng(0)
+    ids = np.arange(12)
+    state_of = np.repeat(np.arange(len(STATES)), 4)
+    dates = pd.to_datetime("2025-03-01") + pd.to_timedelta(np.sort(rng.choice(200, 60, replace=False)), unit="D")
+    cells = [(d, i) for d in dates for i in ids if rng.random() > 0.3]
+    df = pd.DataFrame({
+        "state": pd.Categorical.from_codes(state_of[[i for _, i in cells]], STATES),
+        "district": pd.Categorical.from_codes([i for _, i in cells], [f"D{i:02d}" for i in ids]),
+        "date": [d for d, _ in cells],
+        "district_id": np.array([i for _, i in cells], dtype=np.int32),
+    })
+    for m in MEASURES + ["enrol_rows"]:
+        df[m] = rng.integers(0, 500, len(df)) * (rng.random(len(df)) > 0.1)
+    # As in build_cube, enrolment counts only come with enrolment rows.
+    for m in ["age_0_5", "age_5_17", "age_18_greater"]:
+        df[m] *= df["enrol_rows"] > 0
+    df["total_enrolments"] = df["age_0_5"] + df["age_5_17"] + df["age_18_greater"]
+    return build_date_index(df)
+
+
+@pytest.fixture(scope="module")
+def prefix(day_cube):
+    return build_prefix_sums(day_cube[0], district_names(day_cube[0]))
+
+
+def _ranges(dates, n=40, seed=1):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        a, b = np.sort(rng.choice(len(dates), 2))
+        yield dates[a] - np.timedelta64(int(rng.integers(0, 3)), "D"), dates[b]
+
+
+@pytest.mark.parametrize("state", ["All", "Karnataka", "Nowhere"])
+def test_range_totals_match_slice(day_cube, prefix, state):
+    cube, index = day_cube
+    for start, end in _ranges(index["date"]):
+        assert ipd.range_totals(prefix, start, end, state) == ipd.kpi_totals(
+            ipd.apply_date_range(cube, index, start, end, state))
+
+
+@pytest.mark.parametrize("state", ["All", "Kerala", "Nowhere"])
+def test_range_cube_scores_like_slice(day_cube, prefix, state):
+    cube, index = day_cube
+    for start, end in _ranges(index["date"]):
+        rows = ipd.apply_date_range(cube, index, start, end, state)
+        ranged = ipd.range_cube(prefix, start, end, state)
+        assert ipd.kpi_totals(ranged) == ipd.kpi_totals(rows)
+        assert_frame_equal(ipd.score_districts(ranged).reset_index(drop=True),
+                           ipd.score_districts(rows).reset_index(drop=True), check_dtype=False)
+        assert_frame_equal(ipd.age_composition(ranged), ipd.age_composition(rows), check_dtype=False)
+
+
+def test_open_and_empty_ranges(day_cube, prefix):
+    cube, _ = day_cube
+    assert ipd.range_totals(prefix) == ipd.kpi_totals(cube)
+    assert ipd.range_totals(prefix, "2030-01-01", "2030-12-31") == {"enrol": 0, "demo": 0, "bio": 0}
+    assert len(ipd.range_cube(prefix, "2030-01-01", "2030-12-31")) == 0
+    # An inverted range is empty, not negative.
+    assert ipd.range_totals(prefix, "2025-09-01", "2025-03-01") == {"enrol": 0, "demo": 0, "bio": 0}
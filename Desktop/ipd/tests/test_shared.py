@@ -0,0 +1,31 @@
+"""Publishing and cleanup of shared-memory frames."""
+import pandas as pd
+import pytest
+
+from ipd_engine.shared import shared_frames
+
+
+def _frames(value):
+    return lambda: {"cube": pd.DataFrame({"a": [value]})}
+
+
+def test_keys_sharing_a_prefix_are_kept_apart(tmp_path):
+    shared_frames("aggregates-streaming", "5.aaaa", _frames(1), root=tmp_path)
+    shared_frames("aggregates", "5.bbbb", _frames(2), root=tmp_path)
+    streaming = shared_frames("aggregates-streaming", "5.aaaa", _frames(99), root=tmp_path)
+    assert streaming["cube"]["a"].tolist() == [1]
+
+
+def test_new_version_replaces_old(tmp_path):
+    shared_frames("aggregates", "5.aaaa", _frames(1), root=tmp_path)
+    assert shared_frames("aggregates", "5.bbbb", _frames(2), root=tmp_path)["cube"]["a"].tolist() == [2]
+    assert [p.name for p in (tmp_path / "aggregates").iterdir()] == ["5.bbbb"]
+
+
+def test_failed_build_leaves_nothing_behind(tmp_path):
+    def build():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        shared_frames("aggregates", "5.aaaa", build, root=tmp_path)
+    assert list((tmp_path / "aggregates").iterdir()) == []
@@ -0,0 +1,34 @@
+"""Folding partial streaming aggregates."""
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+
+from ipd_engine.kernels import group_sum
+from ipd_engine.streaming import fold
+
+KEYS = ["state", "district_id", "date"]
+
+
+def _frame(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "state": pd.Categorical(rng.choice(["A", "B", "C"], n)),
+        "district_id": rng.integers(0, 40, n).astype(np.int32),
+        "date": pd.to_datetime("2025-03-01") + pd.to_timedelta(rng.integers(0, 120, n), unit="D"),
+        "x": rng.integers(0, 1000, n),
+    })
+
+
+def test_fold_sums_overlapping_parts():
+    df = _frame()
+    parts = [group_sum(part, KEYS, ["x"], count="rows") for part in (df.iloc[:2000], df.iloc[2000:3500], df.iloc[3500:])]
+    grouped = df.groupby(KEYS, observed=True)
+    want = grouped[["x"]].sum().assign(rows=grouped.size()).reset_index()
+    assert_frame_equal(fold(parts, KEYS).reset_index(drop=True), want, check_dtype=False)
+
+
+def test_fold_only_empty_parts():
+    empty = group_sum(_frame().iloc[:0], KEYS, ["x"], count="rows")
+    out = fold([empty, empty], KEYS)
+    assert list(out.columns) == KEYS + ["x", "rows"]
+    assert len(out) == 0